@@ -1,10 +1,29 @@
+import logging
+
 import pytest
 from library import Library
 
 
+@pytest.fixture(scope="session", autouse=True)
+def _library_logger():
+    """Configure the library logger once for the whole session.
+
+    Opening the logger and setting its level here means log-asserting
+    tests only adjust capture thresholds (caplog.at_level) instead of
+    re-walking the logger hierarchy per test.
+    """
+    lg = logging.getLogger("library")
+    lg.setLevel(logging.DEBUG)
+    yield lg
+
+
 @pytest.fixture
 def db_lib(tmp_path):
-    """Create a temporary sqlite database file and yield a Library connected to it."""
+    """Create a temporary sqlite database file and yield a Library connected to it.
+
+    Only tests that exercise on-disk persistence need this; everything else
+    should use the faster in-memory fixtures below.
+    """
     db_file = tmp_path / "test_library.db"
     lib = Library(db_path=str(db_file))
     yield lib
@@ -14,13 +33,44 @@ def db_lib(tmp_path):
         pass
 
 
+@pytest.fixture(scope="module")
+def _shared_lib():
+    """Module-scoped in-memory Library shared by all tests in a module.
+
+    Constructing a Library means opening a connection, creating tables,
+    indexes and the FTS mirror — doing that once per module instead of
+    once per test keeps setup cost O(modules), not O(tests). Tests get a
+    clean view through `empty_lib`, which resets this instance.
+    """
+    lib = Library()
+    yield lib
+    try:
+        lib.close()
+    except Exception:
+        pass
+
+
 @pytest.fixture
-def empty_lib(db_lib):
-    """Alias for an empty DB-backed library (keeps existing tests unchanged)."""
-    return db_lib
+def empty_lib(_shared_lib):
+    """Empty Library: the shared module instance, reset before each test."""
+    _shared_lib.reset()
+    return _shared_lib
 
 
 @pytest.fixture
-def lib_with_one_book(db_lib):
-    db_lib.add_book("Python Basics", "Alice Author", "编程")
-    return db_lib
+def lib_with_one_book(empty_lib):
+    empty_lib.add_book("Python Basics", "Alice Author", "编程")
+    return empty_lib
+
+
+@pytest.fixture
+def borrowed_lib(lib_with_one_book):
+    """Library where user1 has already borrowed "Python Basics".
+
+    Several tests only care about the post-borrow state; sharing the
+    add_user + borrow_book sequence here keeps that setup in one place
+    instead of repeating it per test.
+    """
+    lib_with_one_book.add_user("user1")
+    lib_with_one_book.borrow_book("user1", "Python Basics")
+    return lib_with_one_book
@@ -1,29 +1,130 @@
+from collections import defaultdict
+from contextlib import contextmanager
+from functools import lru_cache
 from typing import Optional
+import atexit
 import logging
+import logging.handlers
 import os
+import queue
 import sqlite3
 
 logger = logging.getLogger(__name__)
 
-# =====================================================================
-# 日志配置
-# =====================================================================
-# 配置默认的文件日志（写入到 library_project/logs/library.log），包含时间戳和级别
-# 日志记录了所有的操作（添加、删除、搜索等），用于审计和调试
-try:
-    base_dir = os.path.dirname(__file__)
-    logs_dir = os.path.join(base_dir, "logs")
-    os.makedirs(logs_dir, exist_ok=True)
-    logfile = os.path.join(logs_dir, "library.log")
-    if not logger.hasHandlers():
-        fh = logging.FileHandler(logfile, encoding="utf-8")
-        fmt = logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s", datefmt="%Y-%m-%d %H:%M:%S")
-        fh.setFormatter(fmt)
-        logger.addHandler(fh)
-        logger.setLevel(logging.INFO)
-except Exception:
-    # 日志配置失败时不阻塞功能（例如在只读文件系统）
-    pass
+
+def _is_blank(s: str) -> bool:
+    """判断字符串是否为空或仅由空白字符组成。
+
+    等价于 `not s.strip()`，但 isspace() 在 C 层直接判断，
+    不需要为了测空而构造一个 strip 后的临时字符串。
+    """
+    return not s or s.isspace()
+
+
+@lru_cache(maxsize=1024)
+def _cf(s: str) -> str:
+    """casefold 查询字符串并缓存结果。
+
+    借阅/归还/删除/分类过滤的查询词在真实负载里高度重复，
+    缓存后重复查询的 casefold 成本从 O(len) 降为一次字典命中。
+    仅用于调用方传入的查询词；书籍数据的 casefold 已在插入时缓存。
+    """
+    return s.casefold()
+
+
+class _TitleView:
+    """书名 -> 书籍字典的只读视图（大小写不敏感，O(1) 成员判断）。
+
+    直接包住 Library 的内部书名索引，不复制数据：查找时把键
+    casefold 后探查索引即可，调用方（测试、上层代码）用原始书名
+    就能做 `title in lib.books_by_title` 的常数时间判断，
+    不必再对 books 列表做线性扫描。
+    """
+
+    __slots__ = ("_index",)
+
+    def __init__(self, index):
+        self._index = index
+
+    def __contains__(self, title):
+        return title.casefold() in self._index
+
+    def __getitem__(self, title):
+        return self._index[title.casefold()]
+
+    def get(self, title, default=None):
+        return self._index.get(title.casefold(), default)
+
+    def __len__(self):
+        return len(self._index)
+
+    def __iter__(self):
+        # 迭代产出原始书名（索引键是 casefold 形式，不直接暴露）
+        return (b["title"] for b in self._index.values())
+
+
+class Result(str):
+    """借阅/归还操作的结果：携带状态码的消息字符串。
+
+    仍然是 str 的子类：既有调用方（打印、子串断言、startswith）
+    不需要任何改动；新代码直接比较 `.status` 状态码——一次短字符串
+    相等比较（字面量已驻留，多为指针比较），而不是对整条消息做
+    O(len) 的子串搜索。
+    """
+
+    # 状态码常量（模块内字面量，自动驻留）
+    BORROWED = "BORROWED"
+    RETURNED = "RETURNED"
+    NOT_FOUND = "NOT_FOUND"
+    NO_USER = "NO_USER"
+
+    __slots__ = ("status",)
+
+    def __new__(cls, status, message):
+        self = str.__new__(cls, message)
+        self.status = status
+        return self
+
+
+# QueueListener 后台线程（configure_logging 启动，进程退出时 atexit 停止）
+_log_listener = None
+
+
+def configure_logging():
+    """配置默认的文件日志（写入到 library_project/logs/library.log）。
+
+    日志包含时间戳和级别，记录了所有的操作（添加、删除、搜索等），用于审计和调试。
+
+    设计说明：
+    - 不在模块导入时配置，而是由入口点（CLI）显式调用，
+      避免 import 本模块就创建 logs/ 目录并打开文件句柄。
+    - 调用线程只向 QueueHandler 的内存队列投递记录（微秒级），
+      后台 QueueListener 线程负责真正落盘：格式化、MemoryHandler
+      批缓冲（容量 1024，ERROR 级别立即刷出）、FileHandler 写文件。
+      用户操作的延迟路径上不再有任何 write() 系统调用。
+    - 进程退出时 atexit 停止 listener，刷出剩余缓冲。
+    - 幂等：重复调用不会重复添加 handler / 启动 listener。
+    """
+    global _log_listener
+    try:
+        base_dir = os.path.dirname(__file__)
+        logs_dir = os.path.join(base_dir, "logs")
+        os.makedirs(logs_dir, exist_ok=True)
+        logfile = os.path.join(logs_dir, "library.log")
+        if not logger.hasHandlers():
+            fh = logging.FileHandler(logfile, encoding="utf-8")
+            fmt = logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s", datefmt="%Y-%m-%d %H:%M:%S")
+            fh.setFormatter(fmt)
+            mh = logging.handlers.MemoryHandler(1024, flushLevel=logging.ERROR, target=fh)
+            q = queue.Queue(-1)
+            logger.addHandler(logging.handlers.QueueHandler(q))
+            logger.setLevel(logging.INFO)
+            _log_listener = logging.handlers.QueueListener(q, mh, respect_handler_level=True)
+            _log_listener.start()
+            atexit.register(_log_listener.stop)
+    except Exception:
+        # 日志配置失败时不阻塞功能（例如在只读文件系统）
+        pass
 
 
 class Library:
@@ -57,6 +158,28 @@ class Library:
     """
     MAX_LEN = 200
 
+    # 热路径 SQL 统一定义为类常量：每次调用复用同一个字符串对象，
+    # 命中 sqlite3 驱动的预编译语句缓存（按 SQL 文本查找），
+    # 避免短查询反复走 parse/plan 流程
+    _SQL_INSERT_BOOK = "INSERT INTO books (title, author, category, available) VALUES (?, ?, ?, 1)"
+    _SQL_DELETE_BORROWED_OF_BOOK = "DELETE FROM borrowed WHERE book_title = ?"
+    _SQL_DELETE_BOOK = "DELETE FROM books WHERE title = ? COLLATE NOCASE"
+    _SQL_MARK_BORROWED = "UPDATE books SET available=0 WHERE title = ? COLLATE NOCASE AND available=1"
+    _SQL_MARK_RETURNED = "UPDATE books SET available=1 WHERE title = ? COLLATE NOCASE AND available=0"
+    _SQL_INSERT_BORROWED = "INSERT OR IGNORE INTO borrowed (username, book_title) VALUES (?, ?)"
+    _SQL_DELETE_BORROWED = "DELETE FROM borrowed WHERE username=? AND book_title=?"
+    _SQL_INSERT_USER = "INSERT INTO users (username) VALUES (?)"
+    # search_book 只有 (author?, category?) 四种参数组合，SQL 预先展开成
+    # 四条成品语句：调用时查表取用，既不再做字符串拼接，也让每种组合
+    # 始终命中驱动的预编译语句缓存
+    _SEARCH_SQL = {
+        (False, False): "SELECT title, author, category, available FROM books WHERE title LIKE ? COLLATE NOCASE",
+        (True, False): "SELECT title, author, category, available FROM books WHERE title LIKE ? COLLATE NOCASE AND author LIKE ? COLLATE NOCASE",
+        (False, True): "SELECT title, author, category, available FROM books WHERE title LIKE ? COLLATE NOCASE AND category LIKE ? COLLATE NOCASE",
+        (True, True): ("SELECT title, author, category, available FROM books WHERE title LIKE ? COLLATE NOCASE"
+                       " AND author LIKE ? COLLATE NOCASE AND category LIKE ? COLLATE NOCASE"),
+    }
+
     def __init__(self, db_path: Optional[str] = None):
         """初始化图书馆系统。
 
@@ -71,8 +194,9 @@ class Library:
             1. 创建或打开 SQLite 连接（check_same_thread=False 支持多线程访问）。
             2. 设置 row_factory 为 sqlite3.Row 以便通过列名访问行数据。
             3. 调用 _ensure_schema() 创建表结构（如不存在）。
-            4. 初始化内存缓存列表 self.books 和字典 self.users。
-            5. 调用 _load_state() 从数据库加载已有数据到内存。
+            4. 初始化内存缓存（书名索引 _title_index 和字典 self.users）。
+            5. 内存缓存惰性加载：首次访问 books/users 等内存结构时
+               才调用 _load_state() 从数据库读入。
         """
         # 处理数据库路径
         if db_path is None:
@@ -92,17 +216,111 @@ class Library:
         else:
             self.db_path = db_path
         
-        # 创建或打开 SQLite 连接，check_same_thread=False 允许多线程访问
-        self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        # 创建或打开 SQLite 连接，check_same_thread=False 允许多线程访问；
+        # cached_statements 放大驱动的预编译语句缓存，热路径 SQL 不必反复 parse/plan
+        self.conn = sqlite3.connect(
+            self.db_path, check_same_thread=False, cached_statements=256
+        )
         # 设置行工厂为 sqlite3.Row，使行数据可以通过列名索引（r["title"]）
         self.conn.row_factory = sqlite3.Row
+        # 关闭驱动的隐式事务管理（自动提交模式）：
+        # 单条语句自动提交，多条语句的操作由 _txn() 显式包事务，
+        # 避免驱动在语句间隐式开/关事务带来的额外提交开销
+        self.conn.isolation_level = None
+        # 启用外键约束执行（SQLite 默认关闭）：
+        # 配合 borrowed 表的 ON DELETE CASCADE，删书时借阅记录由
+        # 数据库一条语句内级联清理，不再需要第二条 DELETE
+        self.conn.execute("PRAGMA foreign_keys=ON")
+        # 文件数据库启用 WAL 及配套性能 PRAGMA：
+        # - WAL + synchronous=NORMAL：提交不再每次整库 fsync，读写也不互相阻塞
+        # - temp_store/cache_size/mmap_size：临时数据进内存、加大页缓存、映射读
+        # - busy_timeout：并发写锁冲突时等待而不是立即报错
+        # :memory: 数据库保持默认日志模式（WAL 对内存库无意义）
+        if self.db_path != ":memory:":
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("PRAGMA synchronous=NORMAL")
+            self.conn.execute("PRAGMA temp_store=MEMORY")
+            self.conn.execute("PRAGMA cache_size=-20000")
+            self.conn.execute("PRAGMA mmap_size=268435456")
+            self.conn.execute("PRAGMA busy_timeout=5000")
         # 创建表结构（如不存在）
         self._ensure_schema()
+        # 只读连接：WAL 下读写互不阻塞，把纯查询（search_book）路由到
+        # 独立的 RO 连接，读线程不必排队等写连接的互斥锁。
+        # :memory: 数据库无法跨连接共享，保持单连接
+        self.conn_ro = None
+        if self.db_path != ":memory:":
+            try:
+                self.conn_ro = sqlite3.connect(
+                    f"file:{self.db_path}?mode=ro", uri=True,
+                    check_same_thread=False, cached_statements=256
+                )
+                self.conn_ro.row_factory = sqlite3.Row
+            except sqlite3.OperationalError:
+                # 打不开只读连接（例如特殊文件系统）时退回单连接
+                self.conn_ro = None
         # 初始化内存缓存
-        self.books = []
-        self.users = {}
-        # 从数据库加载状态到内存
-        self._load_state()
+        self._users = {}
+        # 书名索引：casefold(书名) -> 书籍字典，唯一的内存主存储，
+        # 提供 O(1) 精确查找（dict 保持插入顺序，books 属性按序导出）
+        self._title_index = {}
+        # 分类索引：casefold(分类) -> 该分类下的书籍字典列表
+        # filter_by_category 的成本从 O(N) 降为 O(命中数)
+        self._category_index = defaultdict(list)
+        # 惰性加载：构造时不读全表，首次用到内存缓存时才 _load_state()。
+        # 纯 SQL 的路径（如 search_book）完全不触发加载，
+        # 打开大库做一次查询不必付出整库物化的启动成本
+        self._loaded = False
+
+    @contextmanager
+    def _txn(self):
+        """显式事务块：BEGIN IMMEDIATE ... COMMIT，出错时 ROLLBACK。
+
+        连接工作在自动提交模式（isolation_level=None），多条语句的
+        操作用本方法包成一个事务：一次提交只刷一次 WAL 帧，而不是
+        每条语句各自隐式开关事务。BEGIN IMMEDIATE 一开始就取写锁，
+        避免事务中途锁升级时的忙等。
+        """
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+        else:
+            self.conn.execute("COMMIT")
+
+    def _ensure_loaded(self):
+        """确保内存缓存已从数据库加载（只加载一次）。"""
+        if not self._loaded:
+            self._load_state()
+
+    @property
+    def users(self):
+        """用户名 -> User 对象的字典（首次访问时从数据库加载）。"""
+        self._ensure_loaded()
+        return self._users
+
+    @property
+    def books(self):
+        """全部书籍的列表视图（按插入顺序）。
+
+        书籍只存在 _title_index 一个内存结构里，本属性按需导出列表，
+        兼容把 books 当作 list 访问的既有调用方和测试。
+        消除了"列表 + 索引"双写：删除不再需要交换删除/下标修正。
+        """
+        self._ensure_loaded()
+        return list(self._title_index.values())
+
+    @property
+    def books_by_title(self):
+        """书名索引的只读视图：`"书名" in lib.books_by_title` 为 O(1)。
+
+        与 books 列表导出不同，这里不构造新容器，直接按大小写
+        不敏感的书名探查内部索引；适合存在性断言和精确取书。
+        """
+        self._ensure_loaded()
+        return _TitleView(self._title_index)
 
     def _ensure_schema(self):
         """确保数据库表结构存在，若不存在则创建。
@@ -115,13 +333,17 @@ class Library:
             - borrowed: 存储用户借阅关系（多对多关系）。
         """
         cur = self.conn.cursor()
+        # 所有建表/建索引语句放进一个事务，一次提交
+        cur.execute("BEGIN IMMEDIATE")
         
         # =====================================================================
         # 创建 books 表：存储书籍基本信息和借阅状态
         # =====================================================================
         # 表结构说明：
         #   id: INTEGER PRIMARY KEY - 自增主键，唯一标识每本书
-        #   title: TEXT UNIQUE NOT NULL - 书名，唯一约束防止重复添加同名书籍
+        #   title: TEXT NOT NULL COLLATE NOCASE UNIQUE - 书名，唯一约束防止重复
+        #       添加同名书籍；NOCASE 让数据库原生执行大小写不敏感的唯一性，
+        #       与内存索引的 casefold 去重语义一致
         #   author: TEXT NOT NULL - 作者名，必须提供
         #   category: TEXT - 分类（可选），允许 NULL
         #   available: INTEGER NOT NULL DEFAULT 1 - 借阅状态（1=可借，0=已借出）
@@ -129,7 +351,7 @@ class Library:
             """
             CREATE TABLE IF NOT EXISTS books (
                 id INTEGER PRIMARY KEY,
-                title TEXT UNIQUE NOT NULL,
+                title TEXT NOT NULL COLLATE NOCASE UNIQUE,
                 author TEXT NOT NULL,
                 category TEXT,
                 available INTEGER NOT NULL DEFAULT 1
@@ -166,19 +388,70 @@ class Library:
                 username TEXT,
                 book_title TEXT,
                 PRIMARY KEY (username, book_title),
-                FOREIGN KEY(username) REFERENCES users(username),
-                FOREIGN KEY(book_title) REFERENCES books(title)
+                FOREIGN KEY(username) REFERENCES users(username) ON DELETE CASCADE,
+                FOREIGN KEY(book_title) REFERENCES books(title) ON DELETE CASCADE
             )
             """
         )
-        self.conn.commit()
+
+        # =====================================================================
+        # 大小写不敏感索引
+        # =====================================================================
+        # 查询统一使用大小写不敏感比较；COLLATE NOCASE 索引让这类
+        # 精确匹配走 B-tree（O(log N)），而不是全表扫描 + 每行 lower()
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_title_ci ON books(title COLLATE NOCASE)")
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_category_ci ON books(category COLLATE NOCASE)")
+        # 借阅表按书名的删除（remove_book 级联清理）走索引而非全表扫描
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_borrowed_book ON borrowed(book_title)")
+
+        # =====================================================================
+        # FTS5 全文索引（books_fts，可选）
+        # =====================================================================
+        # trigram 分词器提供与 LIKE '%x%' 一致的大小写不敏感子串语义
+        # （检索词至少 3 个字符），查询走 C 实现的倒排索引而不是全表扫描。
+        # 通过触发器与 books 表保持同步；SQLite 过旧（无 FTS5/trigram）时
+        # 自动禁用，search_book 退回 LIKE 路径。
+        try:
+            cur.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS books_fts "
+                "USING fts5(title, author, category, tokenize='trigram')"
+            )
+            cur.execute(
+                "CREATE TRIGGER IF NOT EXISTS books_fts_ai AFTER INSERT ON books BEGIN "
+                "INSERT INTO books_fts(rowid, title, author, category) "
+                "VALUES (new.id, new.title, new.author, new.category); END"
+            )
+            cur.execute(
+                "CREATE TRIGGER IF NOT EXISTS books_fts_ad AFTER DELETE ON books BEGIN "
+                "DELETE FROM books_fts WHERE rowid = old.id; END"
+            )
+            # 回填已有数据（打开旧数据库文件时）
+            cur.execute(
+                "INSERT INTO books_fts(rowid, title, author, category) "
+                "SELECT id, title, author, category FROM books "
+                "WHERE id NOT IN (SELECT rowid FROM books_fts)"
+            )
+            self._fts_enabled = True
+        except sqlite3.OperationalError:
+            self._fts_enabled = False
+        # 收集索引统计信息（sqlite_stat1），让查询计划器在多索引可选时
+        # 做出正确选择；对已有数据的库打开时尤其重要
+        cur.execute("ANALYZE")
+        cur.execute("COMMIT")
+        # 旧版数据库文件的 borrowed 表可能没有 ON DELETE CASCADE
+        # （CREATE TABLE IF NOT EXISTS 不会改写既有表结构），
+        # 据此决定 remove_book 是否还需要手动清理借阅记录
+        row = cur.execute(
+            "SELECT sql FROM sqlite_master WHERE type='table' AND name='borrowed'"
+        ).fetchone()
+        self._cascade_fk = bool(row) and "ON DELETE CASCADE" in row["sql"]
 
     def _load_state(self):
         """从 SQLite 数据库加载数据到内存缓存。
         
         此方法在初始化时调用，实现内存缓存与数据库的同步，用于：
-        1. 读取数据库中的所有书籍，填充 self.books 列表。
-           这样做是为了保持与原系统的兼容性（test fixtures 期望 self.books 是列表）。
+        1. 读取数据库中的所有书籍，填充书名索引 _title_index（内存主存储，
+           books 属性据此导出列表，保持 test fixtures 期望的 list 语义）。
         2. 读取所有用户，创建 User 对象，并加载每个用户的借阅历史。
         3. 为后续操作建立内存副本以加快访问速度（避免频繁查询数据库）。
         
@@ -188,44 +461,81 @@ class Library:
         - 可以通过调用此方法重新加载数据（清空当前内存副本）。
         """
         cur = self.conn.cursor()
+        # 只读快照事务：三张表的读取落在同一个一致性视图里，
+        # 也省去每条 SELECT 各自开关隐式事务的开销
+        cur.execute("BEGIN")
         
         # =====================================================================
-        # 加载所有书籍到 self.books（内存缓存）
+        # 加载所有书籍到书名索引（内存缓存）
         # =====================================================================
         # SELECT 查询获取所有书籍信息（不过滤，包括已借出的书）
         cur.execute("SELECT title, author, category, available FROM books")
         rows = cur.fetchall()
         # 将数据库行转换为字典格式，available 转为布尔值（1->True, 0->False）
-        # 这与原系统的数据格式保持一致
-        self.books = [
+        # 这与原系统的数据格式保持一致；_*_cf 字段缓存 casefold 结果，
+        # 供索引维护使用，避免之后每次比较都重新分配小写副本。
+        # 无分类时 _category_cf 统一存空串（而不是 None），
+        # 下游判断只需一次真值测试，不必再区分 None 分支
+        self._users = {}
+        books = [
             {
                 "title": r["title"],
                 "author": r["author"],
                 "category": r["category"],
-                "available": bool(r["available"])  # 1 转为 True，0 转为 False
+                "available": bool(r["available"]),  # 1 转为 True，0 转为 False
+                "_title_cf": r["title"].casefold(),
+                "_author_cf": r["author"].casefold(),
+                "_category_cf": r["category"].casefold() if r["category"] else ""
             }
             for r in rows
         ]
+        # 重建书名索引（casefold 后的书名 -> 书籍字典，即内存主存储）与分类索引
+        self._title_index = {b["_title_cf"]: b for b in books}
+        self._category_index = defaultdict(list)
+        for b in books:
+            if b["_category_cf"]:
+                self._category_index[b["_category_cf"]].append(b)
 
         # =====================================================================
         # 加载所有用户及其借阅历史到 self.users（内存缓存）
         # =====================================================================
-        # SELECT 查询获取所有用户
-        cur.execute("SELECT username FROM users")
-        rows = cur.fetchall()
-        for r in rows:
-            # 创建 User 对象
+        # 一次 LEFT JOIN + GROUP_CONCAT 查询同时取回用户及其借阅清单：
+        # 每个用户一行，借阅书名在数据库端用 0x1F（ASCII 单元分隔符，
+        # 不会出现在正常书名里）拼接，Python 端按行 split 即可，
+        # 省去为每条借阅记录分配一个 Row 对象的开销
+        cur.execute(
+            "SELECT u.username AS username, "
+            "GROUP_CONCAT(b.book_title, CHAR(31)) AS titles "
+            "FROM users u LEFT JOIN borrowed b ON b.username = u.username "
+            "GROUP BY u.username"
+        )
+        for r in cur.fetchall():
             u = User(r["username"])
-            
-            # 加载该用户借阅的书籍清单
-            # 从 borrowed 表查询该用户的所有借阅记录
-            cur.execute("SELECT book_title FROM borrowed WHERE username = ?", (r["username"],))
-            br = cur.fetchall()
-            # 将借阅记录转为书名列表，存储到 User 对象的 borrowed_books 属性
-            u.borrowed_books = [b["book_title"] for b in br]
-            
-            # 将用户对象存储到 self.users 字典（以 username 为键）
-            self.users[r["username"]] = u
+            if r["titles"]:
+                titles = r["titles"].split("\x1f")
+                u.borrowed_books = titles
+                u.borrowed_set = set(titles)
+            self._users[r["username"]] = u
+        cur.execute("COMMIT")
+        self._loaded = True
+
+    def reset(self):
+        """清空全部数据（三张表与内存缓存），复用已有连接与表结构。
+
+        面向测试场景：模块级共享一个 Library 实例时，每个测试开始前
+        调用本方法即可回到空库状态，省去反复新建连接、建表、建索引
+        的初始化成本。三条 DELETE 在一个事务里一次提交；books_fts
+        由 AFTER DELETE 触发器同步清空。
+        """
+        with self._txn():
+            self.conn.execute("DELETE FROM borrowed")
+            self.conn.execute("DELETE FROM users")
+            self.conn.execute("DELETE FROM books")
+        self._users = {}
+        self._title_index = {}
+        self._category_index = defaultdict(list)
+        # 空库状态即是加载完成的状态，无需再从数据库读一遍
+        self._loaded = True
 
     def close(self):
         """关闭数据库连接。
@@ -247,8 +557,13 @@ class Library:
                 lib.close()  # 确保在异常情况下也会被调用
         """
         try:
+            # 关闭只读连接（若有）
+            if self.conn_ro is not None:
+                self.conn_ro.close()
             # 提交所有待提交的事务
             self.conn.commit()
+            # 让 SQLite 按需刷新统计信息，改善后续打开时的查询计划
+            self.conn.execute("PRAGMA optimize")
             # 关闭连接
             self.conn.close()
         except Exception:
@@ -285,7 +600,7 @@ class Library:
             bool: 添加成功返回 True，验证失败或重复返回 False。
             
         验证规则：
-            1. 书名和作者名不能为空或纯空格。
+            1. 书名和作者名不能为空或纯空格；存储时裁剪首尾空白。
             2. 若提供分类，也不能为空或纯空格。
             3. 书名和作者名都不能超过 MAX_LEN (200) 个字符。
             4. 书名在整个图书馆中必须唯一（大小写不敏感的比较）。
@@ -293,62 +608,73 @@ class Library:
             
         操作流程：
             1. 验证输入参数的合法性。
-            2. 检查书名是否已存在（大小写不敏感）。
+            2. 通过书名索引检查书名是否已存在（大小写不敏感，O(1)）。
             3. 若存在则返回 False。
             4. 尝试向 books 表插入新记录。
-            5. 若成功，更新内存缓存（self.books 列表）。
+            5. 若成功，更新内存缓存（书名索引与分类索引）。
             6. 记录操作日志（成功或失败）。
-            
+
         数据库操作详解：
-            1. 检查重复：SELECT 1 FROM books WHERE lower(title)=lower(?)
-               - 使用 lower() 实现大小写不敏感的重复检查。
-               
+            1. 检查重复：在内存索引 self._title_index 中查找 casefold 后的书名。
+               - 避免每次添加都往返数据库做一次 SELECT。
+
             2. 插入新书：INSERT INTO books (title, author, category, available) VALUES (?, ?, ?, 1)
                - available 初始值为 1（表示可借阅）。
                - 使用参数化查询（?）防止 SQL 注入。
-            
+
         错误日志：
             - 长度超限：记录 "Add failed: title/author exceed max length"
             - 重复书名：记录 "Add failed: duplicate title"
         """
-        # 验证书名和作者不为空或纯空格
-        if not title.strip() or not author.strip():
+        # 验证书名和作者不为空或纯空格（不构造 strip 副本）
+        if _is_blank(title) or _is_blank(author):
             return False
         # 验证分类（若提供）不为空或纯空格
-        if category is not None and not category.strip():
+        if category is not None and _is_blank(category):
             return False
+        # strip 一次算好、后续全部复用裁剪后的值：
+        # 入库前去掉首尾空白，防止 " Title" 和 "Title" 绕过
+        # NOCASE 唯一约束成为两条记录
+        title = title.strip()
+        author = author.strip()
+        if category is not None:
+            category = category.strip()
         # 验证书名和作者长度不超过限制（防止数据库字段溢出）
         if len(title) > self.MAX_LEN or len(author) > self.MAX_LEN:
             logger.error("Add failed: title/author exceed max length (title=%d, author=%d)", len(title), len(author))
             return False
 
-        cur = self.conn.cursor()
-        
         # 检查书名是否已存在（大小写不敏感）
-        # 这实现了"不区分大小写的 UNIQUE 约束"的行为
-        cur.execute("SELECT 1 FROM books WHERE lower(title)=lower(?)", (title,))
-        if cur.fetchone():
+        # 这实现了"不区分大小写的 UNIQUE 约束"的行为，索引查找为 O(1)
+        self._ensure_loaded()
+        key = title.casefold()
+        if key in self._title_index:
             logger.error("Add failed: duplicate title '%s'", title)
             return False
-        
+
         try:
             # SQL INSERT 操作：将新书添加到 books 表
             # available 初始值为 1（可借阅状态）
-            cur.execute(
-                "INSERT INTO books (title, author, category, available) VALUES (?, ?, ?, 1)",
-                (title, author, category)
-            )
-            # 提交事务到数据库
-            self.conn.commit()
-            # 更新内存缓存（self.books 列表）
-            self.books.append({
+            # conn.execute 直接复用连接内部游标，省一次 Cursor 对象分配
+            self.conn.execute(self._SQL_INSERT_BOOK, (title, author, category))
+            # 自动提交模式：单条 INSERT 无需显式 commit
+            # 更新内存缓存（书名索引与分类索引）
+            # casefold 结果在插入时计算一次并缓存在字典里
+            book = {
                 "title": title,
                 "author": author,
                 "category": category,
-                "available": True  # 新书初始状态为可借
-            })
+                "available": True,  # 新书初始状态为可借
+                "_title_cf": key,
+                "_author_cf": author.casefold(),
+                "_category_cf": category.casefold() if category else ""
+            }
+            self._title_index[key] = book
+            if book["_category_cf"]:
+                self._category_index[book["_category_cf"]].append(book)
             # 记录成功操作
-            logger.info("Added book '%s' by '%s' in category '%s'", title, author, category)
+            if logger.isEnabledFor(logging.INFO):
+                logger.info("Added book '%s' by '%s' in category '%s'", title, author, category)
             return True
         except sqlite3.IntegrityError:
             # 捕获唯一性约束冲突（书名已存在）
@@ -356,6 +682,68 @@ class Library:
             logger.error("Add failed: duplicate title '%s' (db constraint)", title)
             return False
 
+    def add_books(self, records) -> int:
+        """批量添加书籍（单事务 + executemany）。
+
+        参数：
+            records: 可迭代对象，每项为 (title, author, category) 元组
+                （category 可为 None，与 add_book 的可选分类一致）。
+
+        返回值：
+            int: 实际添加成功的书籍数量。
+
+        与逐本调用 add_book 的区别：
+            - 所有 INSERT 在一个事务内通过 executemany 执行，
+              整批只有一次提交/落盘，而不是每本书一次。
+            - 验证规则与 add_book 完全相同；验证失败或重复（包括
+              本批次内部的重复）的条目被跳过，不影响其余条目。
+            - 只记录一条汇总 INFO 日志，而不是每本一条。
+        """
+        self._ensure_loaded()
+        pending = []
+        seen = set()
+        for title, author, category in records:
+            # 与 add_book 相同的验证规则
+            if _is_blank(title) or _is_blank(author):
+                continue
+            if category is not None and _is_blank(category):
+                continue
+            if len(title) > self.MAX_LEN or len(author) > self.MAX_LEN:
+                continue
+            key = title.casefold()
+            if key in self._title_index or key in seen:
+                continue
+            seen.add(key)
+            pending.append({
+                "title": title,
+                "author": author,
+                "category": category,
+                "available": True,
+                "_title_cf": key,
+                "_author_cf": author.casefold(),
+                "_category_cf": category.casefold() if category else ""
+            })
+
+        if not pending:
+            return 0
+
+        # 单事务批量插入：with 块结束时一次性提交（异常则整体回滚）
+        with self._txn():
+            self.conn.executemany(
+                self._SQL_INSERT_BOOK,
+                [(b["title"], b["author"], b["category"]) for b in pending]
+            )
+
+        # 同步内存缓存与索引
+        for book in pending:
+            self._title_index[book["_title_cf"]] = book
+            if book["_category_cf"]:
+                self._category_index[book["_category_cf"]].append(book)
+
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("Added %d books in bulk", len(pending))
+        return len(pending)
+
     def remove_book(self, title: str, prompt: bool = False) -> bool:
         """通过书名删除图书。
         
@@ -369,22 +757,23 @@ class Library:
             
         操作流程：
             1. 若 prompt=True，向用户显示确认提示 [Y/N]。
-            2. 验证书籍是否存在（使用不区分大小写的比较）。
+            2. 通过书名索引验证书籍是否存在（大小写不敏感，O(1)）。
             3. 若存在，先删除关联的借阅记录（防止外键约束冲突）。
             4. 然后删除书籍记录。
-            5. 更新内存缓存（self.books）。
+            5. 更新内存缓存（从书名索引与分类索引中移除，O(1)）。
             6. 记录操作日志。
-            
+
         数据库操作详解：
-            1. 检查查询：SELECT 1 FROM books WHERE lower(title)=lower(?)
-               - 使用 lower() 函数实现书名的大小写不敏感查询。
-               
+            1. 存在性检查：在内存索引 self._title_index 中查找 casefold 后的书名。
+               - 避免一次额外的 SELECT 往返。
+
             2. 删除借阅记录：DELETE FROM borrowed WHERE book_title = ?
                - 必须先删除，因为 borrowed 表有外键约束指向 books 表。
-               - 若先删除 books，外键约束会阻止此删除操作。
+               - 仅旧版数据库文件需要：新建库的 borrowed 表带
+                 ON DELETE CASCADE，借阅记录随书籍删除自动清理。
                
-            3. 删除书籍：DELETE FROM books WHERE lower(title)=lower(?)
-               - 级联效果：如果禁用外键，可能留下孤立的借阅记录。
+            3. 删除书籍：DELETE FROM books WHERE title = ? COLLATE NOCASE
+               - 同时把仍持有该书的用户的内存借阅集合同步清理。
                
         用户交互（prompt=True）：
             - 提示格式："Confirm remove 'book_name'? [Y/N]: "
@@ -405,87 +794,125 @@ class Library:
                 logger.error("Remove aborted: confirmation input failed for '%s'", title)
                 return False
             # 检查用户回复（只接受 'y' 或 'yes'，不区分大小写）
-            if not ans or ans.strip().lower() not in ("y", "yes"):
+            if not ans or ans.strip().casefold() not in ("y", "yes"):
                 # 用户取消
                 logger.info("Remove cancelled by user for '%s'", title)
                 return False
 
-        cur = self.conn.cursor()
-        
-        # 检查书籍是否存在（使用大小写不敏感查询）
-        # 使用 SELECT 1 只返回 1 个字段，性能更高
-        cur.execute("SELECT 1 FROM books WHERE lower(title)=lower(?)", (title,))
-        if not cur.fetchone():
+        # 检查书籍是否存在（内存索引，大小写不敏感，O(1)）
+        self._ensure_loaded()
+        key = _cf(title)
+        if key not in self._title_index:
             # 书籍不存在
             logger.error("Remove failed: '%s' not found", title)
             return False
-        
-        # 先删除借阅记录（清理外键关联）
-        # 这是必要的，因为 borrowed 表有外键约束指向 books(title)
-        cur.execute("DELETE FROM borrowed WHERE book_title = ?", (title,))
-        
-        # 删除书籍记录
-        cur.execute("DELETE FROM books WHERE lower(title)=lower(?)", (title,))
-        
-        # 提交事务
-        self.conn.commit()
-        
-        # 更新内存缓存：移除匹配的书籍（大小写不敏感）
-        self.books = [b for b in self.books if b["title"].lower() != title.lower()]
-        
+
+        cur = self.conn.cursor()
+
+        # 先查出当前借着这本书的用户，以便同步内存中的借阅集合
+        # （borrowed 行本身由数据库级联删除）
+        canonical = self._title_index[key]["title"]
+        cur.execute("SELECT username FROM borrowed WHERE book_title = ?", (canonical,))
+        holders = [r["username"] for r in cur.fetchall()]
+
+        if self._cascade_fk:
+            # 一条 DELETE：borrowed 里的关联行由 ON DELETE CASCADE 清理，
+            # 单语句自动提交，一次 WAL 提交完成整个删除
+            cur.execute(self._SQL_DELETE_BOOK, (title,))
+        else:
+            # 旧表结构（无级联）：两条 DELETE 在一个显式事务里，一次提交
+            with self._txn():
+                cur.execute(self._SQL_DELETE_BORROWED_OF_BOOK, (title,))
+                cur.execute(self._SQL_DELETE_BOOK, (title,))
+
+        # 更新内存缓存：书名索引即主存储，pop 一次即完成删除（O(1)）
+        removed = self._title_index.pop(key)
+        # 同步持有者的内存借阅记录（列表与集合镜像一起清理）
+        for uname in holders:
+            u = self.users.get(uname)
+            if u:
+                u.return_book(canonical)
+        # 同步分类索引：同样用交换删除，免去 list.remove 的尾部平移
+        if removed["_category_cf"]:
+            bucket = self._category_index[removed["_category_cf"]]
+            i = bucket.index(removed)
+            bucket[i] = bucket[-1]
+            bucket.pop()
+
         # 记录成功操作
-        logger.info("Removed book '%s'", title)
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("Removed book '%s'", title)
         return True
 
-    def search_book(self, title: str, author: Optional[str] = None, category: Optional[str] = None) -> list:
+    def search_book(self, title: str, author: Optional[str] = None, category: Optional[str] = None, verbose: bool = False, prefix: bool = False) -> list:
         """通过书名、作者、分类搜索图书（支持模糊匹配）。
-        
+
         参数：
             title (str): 搜索的书名。必须提供，将进行模糊匹配。
             author (Optional[str]): 可选的作者名过滤条件（模糊匹配，不区分大小写）。
             category (Optional[str]): 可选的分类过滤条件（模糊匹配，不区分大小写）。
-            
+            verbose (bool): 若为 True，把每个命中结果打印到终端并记录审计日志。
+                默认为 False：纯查询，无任何 I/O 副作用，可安全用于热路径和测试。
+
         返回值：
             list: 匹配的书籍列表（字典形式），若无匹配返回空列表。
             
         搜索规则：
             - 书名必须包含 title 参数（模糊匹配，不区分大小写）。
+            - prefix=True 时书名按前缀匹配（title%）：无前导通配符的
+              LIKE 可以走 NOCASE 索引做范围扫描（O(log N + 命中数)），
+              适合"按开头找书"的调用方；默认仍为任意位置子串匹配。
             - 若指定 author，则书籍的作者必须包含该字符串。
             - 若指定 category，则书籍的分类必须包含该字符串。
             - 所有条件用 AND 连接（必须全部满足）。
             
         数据库操作详解：
-            SQL 模板：SELECT ... WHERE lower(title) LIKE ? AND lower(author) LIKE ? AND lower(category) LIKE ?
-            - LIKE 操作符用于模糊匹配，%title% 表示在任意位置包含该字符串。
-            - lower() 函数将所有文本转为小写，实现大小写不敏感比较。
-            - 使用参数化查询（?）防止 SQL 注入。
-            - 动态 SQL 构建：根据指定的参数动态添加过滤条件。
+            - 优先走 books_fts（FTS5 trigram）倒排索引：子串语义与 LIKE 一致，
+              成本约为 O(命中数) 而不是全表扫描。要求所有检索词至少 3 个字符。
+            - 否则回退到 LIKE 扫描：
+              SELECT ... WHERE lower(title) LIKE ? AND lower(author) LIKE ? ...
+              %title% 表示在任意位置包含该字符串，lower() 实现大小写不敏感比较。
+            - 两条路径都使用参数化查询（?）防止 SQL 注入。
             
-        输出：
+        输出（仅 verbose=True 时）：
             - 显示匹配结果："已搜索 'title' by author in category"
             - 若无匹配：显示 "No books found matching the search criteria."
-            
-        日志：
-            - 记录搜索条件和结果数量。
+            - 记录搜索条件和结果数量到日志。
         """
-        # 构建基础 SQL 查询（必须提供书名）
-        sql = "SELECT title, author, category, available FROM books WHERE lower(title) LIKE ?"
-        # LIKE 模式：%title% 表示在任意位置包含该字符串
-        params = [f"%{title.lower()}%"]
-        
-        # 若指定了作者，添加作者过滤条件
-        if author:
-            sql += " AND lower(author) LIKE ?"
-            params.append(f"%{author.lower()}%")
-        
-        # 若指定了分类，添加分类过滤条件
-        if category:
-            sql += " AND lower(category) LIKE ?"
-            params.append(f"%{category.lower()}%")
-        
-        # 执行动态构建的 SQL 查询
-        cur = self.conn.cursor()
-        cur.execute(sql, params)
+        # 纯查询走只读连接（文件库），与写操作在 WAL 下并行
+        conn = self.conn_ro or self.conn
+        cur = conn.cursor()
+
+        # FTS5 路径：trigram 倒排索引给出与 LIKE 相同的子串匹配结果，
+        # 但只支持至少 3 个字符的检索词；更短的检索词退回 LIKE 扫描。
+        # 空书名也走 LIKE（%% 匹配所有行）：MATCH 的 title:"" 短语
+        # 不匹配任何内容，语义与"不限制书名"相反
+        needles = [n for n in (title, author, category) if n]
+        if title and not prefix and self._fts_enabled and all(len(n) >= 3 for n in needles):
+            # 列过滤语法 column:"needle"；双引号按 FTS 规则加倍转义
+            match_parts = [f'title:"{title.replace(chr(34), chr(34) * 2)}"']
+            if author:
+                match_parts.append(f'author:"{author.replace(chr(34), chr(34) * 2)}"')
+            if category:
+                match_parts.append(f'category:"{category.replace(chr(34), chr(34) * 2)}"')
+            cur.execute(
+                "SELECT b.title, b.author, b.category, b.available "
+                "FROM books_fts f JOIN books b ON b.id = f.rowid "
+                "WHERE books_fts MATCH ? ORDER BY b.id",
+                (" AND ".join(match_parts),)
+            )
+        else:
+            # LIKE 路径：SQL 从 _SEARCH_SQL 按参数组合查表取成品语句，
+            # 前缀/子串的差别只在绑定的模式串里（title% vs %title%），
+            # 无前导 % 的前缀模式配合 COLLATE NOCASE 索引走范围扫描。
+            # 大小写不敏感由 COLLATE NOCASE 负责，参数无需再 casefold
+            sql = self._SEARCH_SQL[(bool(author), bool(category))]
+            params = [f"{title}%" if prefix else f"%{title}%"]
+            if author:
+                params.append(f"%{author}%")
+            if category:
+                params.append(f"%{category}%")
+            cur.execute(sql, params)
         rows = cur.fetchall()
         
         # 将查询结果转换为字典列表，与 self.books 格式保持一致
@@ -499,18 +926,18 @@ class Library:
             for r in rows
         ]
         
-        # 记录搜索操作
-        logger.info("Search performed: title='%s' author='%s' category='%s' -> %d results", title, author, category, len(found))
-        
-        # 显示搜索结果
-        if found:
-            # 显示每本找到的书籍
-            for book in found:
-                print(f"已搜索 '{book['title']}' by {book['author']} in {book['category']}")
-        else:
-            # 未找到匹配的书籍
-            print("No books found matching the search criteria.")
-        
+        # 仅在 verbose 模式下产生 I/O 副作用（打印 + 审计日志）
+        # 默认路径保持纯查询，方便在借阅等热路径或测试中反复调用
+        if verbose:
+            logger.info("Search performed: title='%s' author='%s' category='%s' -> %d results", title, author, category, len(found))
+            if found:
+                # 显示每本找到的书籍
+                for book in found:
+                    print(f"已搜索 '{book['title']}' by {book['author']} in {book['category']}")
+            else:
+                # 未找到匹配的书籍
+                print("No books found matching the search criteria.")
+
         return found
 
     def borrow_book(self, username: str, title: str) -> str:
@@ -521,9 +948,9 @@ class Library:
             title (str): 要借阅的书名（大小写不敏感）。
             
         返回值：
-            str: 操作结果消息。
-                 成功：'Successfully borrowed \'title\' by author.'
-                 失败：'Error: ...' 开头的错误消息。
+            Result: 操作结果（str 子类，附带 status 状态码）。
+                 成功：status=Result.BORROWED，消息 'Successfully borrowed ...'。
+                 失败：status=Result.NO_USER / Result.NOT_FOUND，'Error: ...' 消息。
             
         操作规则：
             1. 用户必须已注册（存在于 users 表和 self.users）。
@@ -535,20 +962,20 @@ class Library:
             
         数据库操作详解：
             1. 检查用户是否存在：从内存缓存 self.users 查询。
-               
-            2. 查找书籍：SELECT title, author, available FROM books WHERE lower(title)=lower(?)
-               - 检查书籍是否存在且可用（available=1）。
-               
+
+            2. 查找书籍：通过 self._title_index 精确定位（大小写不敏感，O(1)），
+               不再往返数据库做 SELECT。
+
             3. 标记为已借出：UPDATE books SET available=0 WHERE lower(title)=lower(?)
                - 将 available 从 1 改为 0。
-               
+
             4. 记录借阅关系：INSERT OR IGNORE INTO borrowed (username, book_title) VALUES (?, ?)
                - OR IGNORE：若重复借阅会忽略（由于复合主键 (username, book_title)）。
-               
+
         内存缓存同步：
-            1. 更新 self.books 中对应书籍的 available 为 False。
+            1. 更新对应书籍字典的 available 为 False。
             2. 添加书名到 user.borrowed_books 列表。
-            
+
         错误处理：
             - 若用户不存在：返回 "Error: User 'name' not found."
             - 若书籍不存在或已借出：返回 "Error: 'title' not found or already borrowed."
@@ -557,49 +984,40 @@ class Library:
         user = self.users.get(username)
         if not user:
             logger.error("Borrow failed: user '%s' not found (title='%s')", username, title)
-            return f"Error: User '{username}' not found."
-        
-        cur = self.conn.cursor()
-        
-        # 查找可用的书籍（大小写不敏感查询）
-        cur.execute(
-            "SELECT title, author, available FROM books WHERE lower(title)=lower(?)",
-            (title,)
-        )
-        row = cur.fetchone()
+            return Result(Result.NO_USER, f"Error: User '{username}' not found.")
         
+        # 查找书籍（内存索引，大小写不敏感，O(1)）
+        book = self._title_index.get(_cf(title))
+
         # 检查书籍存在且可用
-        if row and row["available"]:
-            # 标记书籍为已借出（available=0）
-            cur.execute(
-                "UPDATE books SET available=0 WHERE lower(title)=lower(?)",
-                (title,)
-            )
-            # 记录借阅关系到 borrowed 表
-            # INSERT OR IGNORE：若复合主键 (username, book_title) 已存在则忽略
-            cur.execute(
-                "INSERT OR IGNORE INTO borrowed (username, book_title) VALUES (?, ?)",
-                (username, row["title"])
-            )
-            # 提交事务
-            self.conn.commit()
-            
-            # 更新内存缓存：修改 self.books 中对应书籍的 available 状态
-            for b in self.books:
-                if b["title"].lower() == title.lower():
-                    b["available"] = False
-                    break
-            
-            # 更新用户的借阅历史：添加书名到 borrowed_books 列表
-            user.borrowed_books.append(row["title"])
-            
+        if book and book["available"]:
+            # UPDATE + INSERT 在一个显式事务里，一次提交；
+            # conn.execute 返回内部游标，无需手动创建 Cursor
+            with self._txn():
+                # 标记书籍为已借出：条件 UPDATE 是一次原子的"测试并置位"，
+                # 状态迁移完全在 SQLite 的编译代码中完成（并发下也不会双借）
+                if not self.conn.execute(self._SQL_MARK_BORROWED, (title,)).rowcount:
+                    # 竞争情形：内存认为可借但数据库已借出
+                    logger.error("Borrow failed: '%s' not found or already borrowed (user='%s')", title, username)
+                    return Result(Result.NOT_FOUND, f"Error: '{title}' not found or already borrowed.")
+                # 记录借阅关系到 borrowed 表
+                # INSERT OR IGNORE：若复合主键 (username, book_title) 已存在则忽略
+                self.conn.execute(self._SQL_INSERT_BORROWED, (username, book["title"]))
+
+            # 更新内存缓存：索引已直接定位到书籍字典
+            book["available"] = False
+
+            # 更新用户的借阅历史：集合判重 + 列表保序追加
+            user.borrow(book["title"])
+
             # 记录成功操作
-            logger.info("User '%s' borrowed '%s'", username, row["title"])
-            return f"Successfully borrowed '{title}' by {row['author']}."
+            if logger.isEnabledFor(logging.INFO):
+                logger.info("User '%s' borrowed '%s'", username, book["title"])
+            return Result(Result.BORROWED, f"Successfully borrowed '{title}' by {book['author']}.")
         
         # 书籍不存在或已借出
         logger.error("Borrow failed: '%s' not found or already borrowed (user='%s')", title, username)
-        return f"Error: '{title}' not found or already borrowed."
+        return Result(Result.NOT_FOUND, f"Error: '{title}' not found or already borrowed.")
 
     def return_book(self, username: str, title: str) -> str:
         """用户归还借阅的书籍。
@@ -609,9 +1027,9 @@ class Library:
             title (str): 要归还的书名（大小写不敏感）。
             
         返回值：
-            str: 操作结果消息。
-                 成功：'Successfully returned \'title\'.'
-                 失败：'Error: ...' 开头的错误消息。
+            Result: 操作结果（str 子类，附带 status 状态码）。
+                 成功：status=Result.RETURNED，消息 'Successfully returned ...'。
+                 失败：status=Result.NO_USER / Result.NOT_FOUND，'Error: ...' 消息。
             
         操作规则：
             1. 用户必须已注册。
@@ -623,20 +1041,20 @@ class Library:
             
         数据库操作详解：
             1. 检查用户是否存在：从内存缓存 self.users 查询。
-               
-            2. 查找已借出的书籍：SELECT title, available FROM books WHERE lower(title)=lower(?)
-               - 检查书籍是否存在且已借出（available=0）。
-               
+
+            2. 查找已借出的书籍：通过 self._title_index 精确定位（大小写不敏感，O(1)），
+               不再往返数据库做 SELECT。
+
             3. 标记为可借阅：UPDATE books SET available=1 WHERE lower(title)=lower(?)
                - 将 available 从 0 改为 1。
-               
+
             4. 删除借阅关系：DELETE FROM borrowed WHERE username=? AND book_title=?
                - 清理借阅记录。
-               
+
         内存缓存同步：
-            1. 更新 self.books 中对应书籍的 available 为 True。
+            1. 更新对应书籍字典的 available 为 True。
             2. 从 user.borrowed_books 列表移除书名。
-            
+
         错误处理：
             - 若用户不存在：返回 "Error: User 'name' not found."
             - 若书籍不存在或未被借出：返回 "Error: 'title' not found or not borrowed."
@@ -645,49 +1063,39 @@ class Library:
         user = self.users.get(username)
         if not user:
             logger.error("Return failed: user '%s' not found (title='%s')", username, title)
-            return f"Error: User '{username}' not found."
-        
-        cur = self.conn.cursor()
-        
-        # 查找已借出的书籍（大小写不敏感查询）
-        cur.execute(
-            "SELECT title, available FROM books WHERE lower(title)=lower(?)",
-            (title,)
-        )
-        row = cur.fetchone()
+            return Result(Result.NO_USER, f"Error: User '{username}' not found.")
         
+        # 查找书籍（内存索引，大小写不敏感，O(1)）
+        book = self._title_index.get(_cf(title))
+
         # 检查书籍存在且已借出
-        if row and not row["available"]:
-            # 标记书籍为可借阅（available=1）
-            cur.execute(
-                "UPDATE books SET available=1 WHERE lower(title)=lower(?)",
-                (title,)
-            )
-            # 删除借阅关系
-            cur.execute(
-                "DELETE FROM borrowed WHERE username=? AND book_title=?",
-                (username, row["title"])
-            )
-            # 提交事务
-            self.conn.commit()
-            
-            # 更新内存缓存：修改 self.books 中对应书籍的 available 状态
-            for b in self.books:
-                if b["title"].lower() == title.lower():
-                    b["available"] = True
-                    break
-            
-            # 更新用户的借阅历史：移除书名从 borrowed_books 列表
-            if row["title"] in user.borrowed_books:
-                user.borrowed_books.remove(row["title"])
-            
+        if book and not book["available"]:
+            # UPDATE + DELETE 在一个显式事务里，一次提交；
+            # conn.execute 返回内部游标，无需手动创建 Cursor
+            with self._txn():
+                # 标记书籍为可借阅：条件 UPDATE 与借出路径对称，
+                # "测试并复位"在 SQLite 的编译代码中一步完成
+                if not self.conn.execute(self._SQL_MARK_RETURNED, (title,)).rowcount:
+                    # 竞争情形：内存认为已借出但数据库已是可借状态
+                    logger.error("Return failed: '%s' not found or not borrowed (user='%s')", title, username)
+                    return Result(Result.NOT_FOUND, f"Error: '{title}' not found or not borrowed.")
+                # 删除借阅关系
+                self.conn.execute(self._SQL_DELETE_BORROWED, (username, book["title"]))
+
+            # 更新内存缓存：索引已直接定位到书籍字典
+            book["available"] = True
+
+            # 更新用户的借阅历史：同步移除列表项与集合镜像（不存在则忽略）
+            user.return_book(book["title"])
+
             # 记录成功操作
-            logger.info("User '%s' returned '%s'", username, title)
-            return f"Successfully returned '{title}'."
+            if logger.isEnabledFor(logging.INFO):
+                logger.info("User '%s' returned '%s'", username, title)
+            return Result(Result.RETURNED, f"Successfully returned '{title}'.")
         
         # 书籍不存在或未被借出
         logger.error("Return failed: '%s' not found or not borrowed (user='%s')", title, username)
-        return f"Error: '{title}' not found or not borrowed."
+        return Result(Result.NOT_FOUND, f"Error: '{title}' not found or not borrowed.")
 
     def get_available_books(self) -> list:
         """获取所有可借阅的图书列表。
@@ -696,33 +1104,20 @@ class Library:
             list: 所有状态为"可借阅"（available=1）的书籍列表（字典形式），
                   若无可借阅书籍返回空列表。
             
-        数据库操作详解：
-            SQL: SELECT title, author, category, available FROM books WHERE available=1
-            - WHERE available=1：只查询可借阅的书籍。
-            - 不包括已借出的书籍（available=0）。
-            
+        实现说明：
+            - 直接扫描内存缓存 self.books 的 available 标志位，
+              不往返数据库，也不为每行重新构造字典。
+            - 不包括已借出的书籍（available=False）。
+
         返回格式：
             [
                 {"title": "书名", "author": "作者", "category": "分类", "available": True},
                 ...
             ]
         """
-        cur = self.conn.cursor()
-        # 查询所有可借阅的书籍
-        cur.execute(
-            "SELECT title, author, category, available FROM books WHERE available=1"
-        )
-        rows = cur.fetchall()
-        # 将查询结果转换为字典列表
-        return [
-            {
-                "title": r["title"],
-                "author": r["author"],
-                "category": r["category"],
-                "available": True
-            }
-            for r in rows
-        ]
+        # 内存缓存即是数据库的同步副本，按 available 过滤即可
+        self._ensure_loaded()
+        return [b for b in self._title_index.values() if b["available"]]
 
     def filter_by_category(self, category: str):
         """按分类筛选书籍。
@@ -737,37 +1132,24 @@ class Library:
             - 分类信息使用完全相等比较（大小写不敏感）。
             - 返回所有状态的书籍（可借阅和已借出）。
             
-        数据库操作详解：
-            SQL: SELECT ... FROM books WHERE lower(category)=lower(?)
-            - lower() 函数将分类转为小写，实现大小写不敏感比较。
-            - 使用参数化查询（?）防止 SQL 注入。
+        实现说明：
+            - 直接读取内存分类索引 self._category_index（casefold 后的分类 -> 书籍列表），
+              成本为 O(命中数)，不需要查询数据库。
             - 注意：这是完全相等比较，不是模糊匹配（与 search_book 不同）。
-            
+
         返回格式：
             [
                 {"title": "书名", "author": "作者", "category": "分类", "available": True/False},
                 ...
             ]
         """
-        cur = self.conn.cursor()
-        # 查询指定分类的所有书籍（包括已借出的）
-        cur.execute(
-            "SELECT title, author, category, available FROM books WHERE lower(category)=lower(?)",
-            (category,)
-        )
-        rows = cur.fetchall()
-        # 将查询结果转换为字典列表，与 self.books 格式保持一致
-        filtered_books = [
-            {
-                "title": r["title"],
-                "author": r["author"],
-                "category": r["category"],
-                "available": bool(r["available"])
-            }
-            for r in rows
-        ]
+        # 从分类索引取出该分类下的所有书籍（包括已借出的）
+        # 复制一份列表，避免调用方改动索引内部状态
+        self._ensure_loaded()
+        filtered_books = list(self._category_index.get(_cf(category), ()))
         # 记录过滤操作
-        logger.info("Filter by category: '%s' -> %d results", category, len(filtered_books))
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("Filter by category: '%s' -> %d results", category, len(filtered_books))
         return filtered_books
 
     def add_user(self, username: str):
@@ -803,12 +1185,10 @@ class Library:
             logger.error("Add user failed: user '%s' already exists", username)
             return False
         
-        cur = self.conn.cursor()
         try:
             # SQL INSERT 操作：将新用户添加到 users 表
-            cur.execute("INSERT INTO users (username) VALUES (?)", (username,))
-            # 提交事务
-            self.conn.commit()
+            self.conn.execute(self._SQL_INSERT_USER, (username,))
+            # 自动提交模式：单条 INSERT 无需显式 commit
             # 创建 User 对象并存储到内存缓存
             u = User(username)
             self.users[username] = u
@@ -839,7 +1219,8 @@ class Library:
             失败："Error: User 'username' not found."
             
         注意：
-            - 借阅历史来自内存缓存 self.users[username].borrowed_books。
+            - 借阅历史来自内存缓存 self.users[username].borrowed_books
+              （列表保持借阅顺序，导出时复制为新列表）。
             - 此方法为查询操作，不涉及数据库修改。
             - 若用户存在但借阅历史为空，返回空列表并显示空的借阅历史。
         """
@@ -848,8 +1229,10 @@ class Library:
         if user:
             # 用户存在，显示借阅历史
             logger.info("View history: user='%s' entries=%d", username, len(user.borrowed_books))
-            print(f"借书的人: {username}, 借阅历史: {user.borrowed_books}")
-            return user.borrowed_books
+            # 列表本身已按借阅顺序排列，复制导出即可
+            history = list(user.borrowed_books)
+            print(f"借书的人: {username}, 借阅历史: {history}")
+            return history
         else:
             # 用户不存在
             logger.error("View history failed: user '%s' not found", username)
@@ -864,26 +1247,34 @@ class User:
     
     属性：
         username (str): 用户名，作为主键唯一标识用户。
-        borrowed_books (list): 用户当前借阅的书籍名称列表。
-        
+        borrowed_books (list): 用户当前借阅的书籍名称列表（保持借阅顺序）。
+        borrowed_set (set): borrowed_books 的集合镜像（O(1) 成员判断）。
+
     设计理由：
         - 保留此类以维护与原系统的兼容性。
         - 借阅信息同时存储在 borrowed 表（数据库）和内存缓存中。
-        - borrowed_books 列表由 Library 类维护，确保与数据库同步。
+        - 列表保序供历史展示，集合镜像供成员判断：两个结构由
+          borrow()/return_book() 同步维护，列表的 O(k) 扫描只在
+          归还时发生一次，判重和存在性检查都走集合。
+        - 使用 __slots__：用户量大时每个实例省去一个 __dict__
+          （内存约为原来的 1/3），属性访问也不再经过字典探查。
     """
-    
+
+    __slots__ = ("username", "borrowed_books", "borrowed_set")
+
     def __init__(self, username: str):
         """初始化用户对象。
         
         参数：
             username (str): 用户名。
             
-        初始化时 borrowed_books 为空列表，通过 borrow() 和 return_book() 方法修改。
+        初始化时 borrowed_books/borrowed_set 为空，通过 borrow() 和 return_book() 方法修改。
         """
         self.username = username
-        # 记录用户借阅的书籍（存储书名列表）
-        # 此列表与数据库 borrowed 表保持同步
+        # 记录用户借阅的书籍：列表保持借阅顺序（历史展示），
+        # 集合镜像提供 O(1) 成员判断；两者与数据库 borrowed 表保持同步
         self.borrowed_books = []
+        self.borrowed_set = set()
 
     def borrow(self, book):
         """将书籍添加到用户的借阅列表。
@@ -896,7 +1287,10 @@ class User:
         - 正常情况下应通过 Library.borrow_book() 调用，而非直接调用此方法。
         - 此方法保留以维护与原系统的兼容性。
         """
-        self.borrowed_books.append(book)
+        # 集合判重（O(1)），列表只追加不扫描
+        if book not in self.borrowed_set:
+            self.borrowed_set.add(book)
+            self.borrowed_books.append(book)
 
     def return_book(self, book):
         """从用户的借阅列表中移除书籍。
@@ -911,7 +1305,8 @@ class User:
         - 正常情况下应通过 Library.return_book() 调用，而非直接调用此方法。
         - 此方法保留以维护与原系统的兼容性。
         """
-        if book in self.borrowed_books:
-            # 从借阅列表中移除该书籍
+        # 先查集合镜像（O(1)），存在才做列表的一次线性移除
+        if book in self.borrowed_set:
+            self.borrowed_set.discard(book)
             self.borrowed_books.remove(book)
         
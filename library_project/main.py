@@ -4,262 +4,468 @@
 支持的命令: add (添加)、remove (删除)、search (搜索)、borrow (借阅)、return (归还)、list (列表)、quit (退出)。
 """
 
+import io
+import re
 import sys
 import os
-from library import Library
-import shlex
+from library import Library, Result, configure_logging
+
+# 日志文件路径：对模块位置是纯函数，导入时算一次，
+# logs 命令不再每次重做 dirname/join 两个 os.path 调用
+_LOG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "logs", "library.log")
+
+
+def tail(path, n):
+    """读取文件末尾 n 行（从文件尾部按块反向扫描）。
+
+    不把整个文件读进内存：从末尾开始按 8 KiB 块回退读取，
+    数够 n 个换行符即停，内存和 CPU 都只与 n·平均行长成正比，
+    与日志文件总大小无关。返回保留行尾换行的字符串列表，
+    可直接交给 writelines 批量写出。
+    """
+    block = 8192
+    with open(path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        pos = f.tell()
+        buf = b""
+        # 多读一行的换行（n+1 个），保证第 n 行是完整的一行
+        while pos > 0 and buf.count(b"\n") <= n:
+            step = min(block, pos)
+            pos -= step
+            f.seek(pos)
+            buf = f.read(step) + buf
+    return [ln.decode("utf-8", errors="replace") for ln in buf.splitlines(keepends=True)[-n:]]
+
+
+# 当前 stdout 是否为交互终端：main() 入口计算一次，
+# maybe_translate 每条消息只读缓存，不再每次做 isatty 调用 + try/except
+IS_TTY = False
+
+# stdin 是否为交互终端：决定 remove 能否中途询问确认。
+# 管道输入下主循环按块缓冲迭代 stdin，中途 input() 会被缓冲越过，
+# 所以只有交互会话才现场确认，脚本用 -y/--yes 显式确认
+IS_INTERACTIVE = False
+
+
+# 术语 -> 译文映射；编译成一个交替正则，一次扫描完成所有替换。
+# 注意 "Error: User" 排在 "Error:" 之前：交替按从左到右优先匹配
+_TRANSLATIONS = {
+    "Successfully borrowed": "成功借阅",
+    "Successfully returned": "成功归还",
+    "Error: User": "错误: 用户",
+    "Error:": "错误:",
+}
+_TRANSLATOR = re.compile("|".join(re.escape(k) for k in _TRANSLATIONS))
+
+
+def maybe_translate(msg: str) -> str:
+    """仅在交互式终端 (tty) 中把库返回的英文消息翻译为中文显示。
+
+    所有关键词由一次正则扫描替换（C 层完成），
+    替代原先每条消息最多 5 次的 Python 子串扫描；未知信息保留原样。
+    """
+    if not IS_TTY:
+        return msg
+    return _TRANSLATOR.sub(lambda m: _TRANSLATIONS[m.group(0)], msg)
+
+
+# 引号短语或连续非空白字符为一个词；findall 一次 C 层扫描出全部词
+_TOKEN_RE = re.compile(r'"([^"]*)"|(\S+)')
+
+
+def _split_args(line):
+    """把命令行拆成空白分隔的词，支持成对双引号括起的短语。
+
+    只覆盖本程序用到的 shlex.split 子集（无转义、无单引号），
+    由一次编译正则匹配完成，省去 shlex 纯 Python 状态机的逐字符开销；
+    引号数为奇数时抛出 ValueError（与 shlex 的未闭合引号错误一致）。
+    """
+    if line.count('"') % 2:
+        raise ValueError("No closing quotation")
+    return [a or b for a, b in _TOKEN_RE.findall(line)]
+
+
+class _ReplState:
+    """REPL 会话状态：当前登录用户与 list 结果缓存。
+
+    lib_version 是图书馆的变更计数：每次成功的增删/借还加一。
+    list_cache 以 (lib_version, 分类) 为键缓存 list 命令的成品输出，
+    库没变时重复 list 直接复用字符串，不再重新过滤和格式化。
+    """
+    __slots__ = ("current_user", "lib_version", "list_cache")
+
+    def __init__(self, current_user):
+        self.current_user = current_user
+        self.lib_version = 0
+        self.list_cache = {}
+
+
+_INVALID = "Invalid command. Type 'quit' to exit."
+
+# 启动横幅：模块加载时拼好一次，main() 里一次 write 写出，
+# 不再每次启动执行 14 个 print 调用（系统测试里 main() 会反复运行）
+_HELP = """\
+欢迎来到简易图书馆系统！
+数据库存储位置: data/library.db
+日志文件位置: logs/library.log
+命令列表：
+  add <书名> <作者> [分类]     - 添加图书
+  remove <书名> [-y|--yes]    - 删除图书（--yes 跳过确认）
+  search <书名> [作者] [分类] - 搜索图书
+  borrow <书名>               - 借阅（当前用户）
+  return <书名>               - 归还（当前用户）
+  list [分类]                 - 列出可用图书（可选分类）
+  add_user <用户名>           - 注册新用户
+  login <用户名>              - 切换用户
+  users                       - 列出已注册用户
+  history                     - 查看当前用户借阅历史
+  quit                        - 退出系统
+  logs [n|all]                - 查看最近 n 行日志或全部日志（默认 200 行）
+"""
+
+
+def _handle_add_user(lib, cmd, state):
+    if len(cmd) < 2:
+        print(_INVALID)
+        return
+    uname = " ".join(cmd[1:])
+    if lib.add_user(uname):
+        print(maybe_translate(f"User '{uname}' added."))
+    else:
+        print(maybe_translate(f"Error: User '{uname}' already exists."))
+
+
+def _handle_login(lib, cmd, state):
+    if len(cmd) < 2:
+        print(_INVALID)
+        return
+    uname = " ".join(cmd[1:])
+    if uname in lib.users:
+        state.current_user = uname
+        print(f"当前用户: {state.current_user}")
+    else:
+        print(f"错误: 用户 '{uname}' 未找到。")
+
+
+def _handle_users(lib, cmd, state):
+    if lib.users:
+        # 标题行与用户行合并成一次输出
+        print("已注册用户:\n" + "\n".join(f"- {u}" for u in lib.users))
+    else:
+        print("当前没有已注册用户。")
+
+
+def _handle_history(lib, cmd, state):
+    current_user = state.current_user
+    if current_user and current_user in lib.users:
+        user = lib.users[current_user]
+        if user.borrowed_books:
+            print(f"{current_user} 的借阅历史:\n"
+                  + "\n".join(f"- {b}" for b in user.borrowed_books))
+        else:
+            print(f"{current_user} 的借阅历史:\n(空)")
+    else:
+        print("未登录用户。使用 login <username> 登录或 add_user <username> 创建用户。")
+
+
+def _handle_add(lib, cmd, state):
+    # 支持：add title author [分类]；cmd 已在主循环统一分词
+    parsed_args = cmd[1:]
+
+    if len(parsed_args) < 2:
+        print("错误: 无效的命令格式。")
+        print("使用方式: add <书名> <作者> [分类]")
+        return
+
+    title = parsed_args[0]
+    author = parsed_args[1]
+    category = parsed_args[2] if len(parsed_args) >= 3 else None
+
+    if lib.add_book(title, author, category):
+        state.lib_version += 1
+        if category:
+            print(maybe_translate(f"Added '{title}' by {author} in {category}."))
+        else:
+            print(maybe_translate(f"Added '{title}' by {author}."))
+    else:
+        print(f"Error: '{title}' already exists.")
+
+
+def _handle_remove(lib, cmd, state):
+    if len(cmd) < 2:
+        print(_INVALID)
+        return
+    args = cmd[1:]
+    # -y/--yes：跳过交互确认（管道/脚本输入删除时的确认方式）
+    assume_yes = False
+    if args[-1] in ("-y", "--yes"):
+        assume_yes = True
+        args = args[:-1]
+    if not args:
+        print(_INVALID)
+        return
+    title = " ".join(args)
+    # 只有交互终端且未给 --yes 时才现场询问确认
+    if lib.remove_book(title, prompt=not assume_yes and IS_INTERACTIVE):
+        state.lib_version += 1
+        print(f"Removed '{title}'.")
+    else:
+        print(f"Error: '{title}' not found or removal cancelled.")
+
+
+def _handle_search(lib, cmd, state):
+    if len(cmd) < 2:
+        print(_INVALID)
+        return
+    # 支持：search title [author] [category]；cmd 已在主循环统一分词
+    parsed_args = cmd[1:]
+
+    title = parsed_args[0]
+    author = parsed_args[1] if len(parsed_args) >= 2 else None
+    category = parsed_args[2] if len(parsed_args) >= 3 else None
+
+    results = lib.search_book(title, author, category)
+    if results:
+        # 攒成一个字符串一次输出，而不是每条结果一次 print
+        print("\n".join(
+            f"- '{book['title']}' by {book['author']} "
+            f"({'Available' if book['available'] else 'Borrowed'})"
+            for book in results
+        ))
+    else:
+        print("No books found.")
+
+
+def _handle_borrow(lib, cmd, state):
+    if len(cmd) < 2:
+        print(_INVALID)
+        return
+    title = " ".join(cmd[1:])
+    # 使用当前登录用户进行借阅
+    msg = lib.borrow_book(state.current_user, title)
+    # 状态码比较（驻留短字符串），不再对消息做 startswith 扫描
+    if msg.status == Result.BORROWED:
+        state.lib_version += 1
+    print(maybe_translate(msg))
+
+
+def _handle_return(lib, cmd, state):
+    if len(cmd) < 2:
+        print(_INVALID)
+        return
+    title = " ".join(cmd[1:])
+    msg = lib.return_book(state.current_user, title)
+    if msg.status == Result.RETURNED:
+        state.lib_version += 1
+    print(maybe_translate(msg))
+
+
+def _handle_list(lib, cmd, state):
+    # 如果用户输入了分类，获取分类（支持多字符输入）
+    if len(cmd) > 1:
+        category = " ".join(cmd[1:]).strip()  # 获取分类（可能是多字符）
+    else:
+        category = None  # 如果没有指定分类，列出所有书籍
+
+    # 以 (变更计数, 分类) 为键缓存成品输出：库没变时重复 list 零格式化成本
+    key = (state.lib_version, category)
+    output = state.list_cache.get(key)
+    if output is None:
+        # 如果指定了分类，使用 filter_by_category 进行筛选
+        if category:
+            filtered_books = lib.filter_by_category(category)
+            if filtered_books:
+                # 攒成一个字符串一次输出，而不是每本书一次 print
+                output = "\n".join(
+                    f"- '{book['title']}' by {book['author']} in {book['category']}"
+                    for book in filtered_books
+                )
+            else:
+                output = f"No available books in the '{category}' category."
+        else:
+            # 如果没有指定分类，列出所有可用书籍
+            available_books = lib.get_available_books()
+            if available_books:
+                output = "\n".join(
+                    f"- '{book['title']}' by {book['author']} in {book['category']}"
+                    if book.get("category")
+                    else f"- '{book['title']}' by {book['author']}"
+                    for book in available_books
+                )
+            else:
+                output = "No available books."
+        state.list_cache[key] = output
+    print(output)
+
+
+def _handle_logs(lib, cmd, state):
+    # 显示日志文件内容：logs [n] (显示最近 n 行)，n 可为 'all' 显示全部；默认 200 行
+    # 日志文件位于本模块同级目录的 logs/library.log
+    try:
+        # 解析参数
+        n = 200
+        if len(cmd) >= 2:
+            if cmd[1].lower() == "all":
+                n = None
+            else:
+                try:
+                    n = int(cmd[1])
+                except ValueError:
+                    print("参数错误：请输入数字行数或 'all'。示例：logs 100 或 logs all")
+                    return
+
+        # 读取并显示内容。EAFP：直接 open，文件不存在由异常分支处理，
+        # 省去 exists 的一次 stat 系统调用，也避开检查与打开之间的竞态
+        if n is None:
+            with open(_LOG_PATH, "r", encoding="utf-8") as f:
+                print(f.read())
+        else:
+            # 从文件尾部反向读取最后 n 行；行自带换行，writelines
+            # 批量写出，不再拼接整块字符串的中间副本
+            lines = tail(_LOG_PATH, n)
+            sys.stdout.writelines(lines)
+            if lines and not lines[-1].endswith("\n"):
+                sys.stdout.write("\n")
+    except FileNotFoundError:
+        print("日志文件不存在。若尚未产生日志，请先执行一些操作。")
+    except Exception as e:
+        print(f"无法读取日志文件: {e}")
+
+
+# 命令 -> 处理函数的分发表：每条命令一次哈希查找，
+# 替代逐条字符串比较的 if/elif 链。
+# 键经 sys.intern 驻留，查表时运行期的 action 同样驻留后
+# 字典查找走指针相等的快路径，省去逐字符比较
+DISPATCH = {
+    "add_user": _handle_add_user,
+    "login": _handle_login,
+    "users": _handle_users,
+    "history": _handle_history,
+    "add": _handle_add,
+    "remove": _handle_remove,
+    "search": _handle_search,
+    "borrow": _handle_borrow,
+    "return": _handle_return,
+    "list": _handle_list,
+    "logs": _handle_logs,
+}
+DISPATCH = {sys.intern(k): v for k, v in DISPATCH.items()}
 
 
 def main():
+    # 入口点负责初始化文件日志（库本身 import 时不再配置 handler）
+    configure_logging()
     # 使用 data 文件夹中的数据库进行持久化存储
     lib = Library(db_path="library.db")  # 自动存储到 data/library.db
-    print("欢迎来到简易图书馆系统！")
-    print("数据库存储位置: data/library.db")
-    print("日志文件位置: logs/library.log")
-    print("命令列表：")
-    print("  add <书名> <作者> [分类]     - 添加图书")
-    print("  remove <书名>               - 删除图书")
-    print("  search <书名> [作者] [分类] - 搜索图书")
-    print("  borrow <书名>               - 借阅（当前用户）")
-    print("  return <书名>               - 归还（当前用户）")
-    print("  list [分类]                 - 列出可用图书（可选分类）")
-    print("  add_user <用户名>           - 注册新用户")
-    print("  login <用户名>              - 切换用户")
-    print("  users                       - 列出已注册用户")
-    print("  history                     - 查看当前用户借阅历史")
-    print("  quit                        - 退出系统")
-    print("  logs [n|all]                - 查看最近 n 行日志或全部日志（默认 200 行）")
-    
+    sys.stdout.write(_HELP)
+
     # 创建默认用户用于借阅和归还操作，并维护当前登录用户
     lib.add_user("default_user")
-    current_user = "default_user"
-
-    # 翻译辅助：仅在交互式终端 (tty) 中把库返回的英文消息翻译为中文显示
-    def maybe_translate(msg: str) -> str:
-        try:
-            is_tty = sys.stdout.isatty()
-        except Exception:
-            is_tty = False
-        if not is_tty:
-            return msg
-
-        # 简单的关键词映射，保留未知信息原样
-        if "Successfully borrowed" in msg:
-            # 示例: "Successfully borrowed 'Book' by Author."
-            return msg.replace("Successfully borrowed", "成功借阅")
-        if "Successfully returned" in msg:
-            return msg.replace("Successfully returned", "成功归还")
-        if "Error: User" in msg:
-            return msg.replace("Error: User", "错误: 用户")
-        if "Error: '" in msg and ("not found or already borrowed" in msg or "not found or not borrowed" in msg):
-            return msg.replace("Error:", "错误:")
-        if msg.startswith("Added '"):
-            # 保留原文但也显示中文提示
-            return msg
-        return msg
+    state = _ReplState("default_user")
 
-    while True:
-        try:
-            cmd_input = input("> ").strip()
-            if not cmd_input:
-                continue
-            
-            # 安全地分割命令，处理可能的编码问题
-            try:
-                cmd = cmd_input.split()
-            except Exception as e:
-                print(f"错误: 无法处理输入 ({e})")
-                continue
-                
-            if not cmd:
-                continue
+    # 读取命令的方式按输入源选择：
+    # - 交互终端：input("> ") 给出提示符
+    # - 管道/重定向（测试、脚本）：直接迭代 sys.stdin，按块缓冲读取，
+    #   省去每行一次的提示符写出和逐行读系统调用
+    global IS_INTERACTIVE
+    try:
+        IS_INTERACTIVE = sys.stdin.isatty()
+    except Exception:
+        IS_INTERACTIVE = False
+    if IS_INTERACTIVE:
+        def read_command():
+            return input("> ")
+    else:
+        stdin_iter = iter(sys.stdin)
 
-            action = cmd[0].lower()
-            if action == "quit":
-                print("再见!")
-                break
-            elif action == "add_user" and len(cmd) >= 2:
-                uname = " ".join(cmd[1:])
-                if lib.add_user(uname):
-                    print(maybe_translate(f"User '{uname}' added."))
-                else:
-                    print(maybe_translate(f"Error: User '{uname}' already exists."))
-                continue
+        def read_command():
+            try:
+                return next(stdin_iter)
+            except StopIteration:
+                raise EOFError
 
-            elif action == "login" and len(cmd) >= 2:
-                uname = " ".join(cmd[1:])
-                if uname in lib.users:
-                    current_user = uname
-                    print(f"当前用户: {current_user}")
-                else:
-                    print(f"错误: 用户 '{uname}' 未找到。")
-                continue
+    # 非终端输出（管道/测试捕获）换成 16 KiB 块缓冲写出：
+    # print 不再每行一次 write 系统调用，批量输出（list/logs/search）
+    # 合并成大块落盘；结束时 finally 统一 flush 并还原 stdout
+    global IS_TTY
+    try:
+        IS_TTY = sys.stdout.isatty()
+    except Exception:
+        IS_TTY = False
+    orig_stdout = None
+    try:
+        if not IS_TTY:
+            orig_stdout = sys.stdout
+            # 先刷出原 stdout 文本层滞留的内容（启动横幅）：
+            # 换上新包装后它不会再被经过，否则要等解释器退出才落盘，
+            # 排到整个会话输出的最后
+            orig_stdout.flush()
+            sys.stdout = io.TextIOWrapper(
+                io.BufferedWriter(sys.stdout.buffer, buffer_size=1 << 14),
+                encoding="utf-8", line_buffering=False
+            )
+    except Exception:
+        orig_stdout = None
 
-            elif action == "users":
-                if lib.users:
-                    print("已注册用户:")
-                    for u in lib.users:
-                        print(f"- {u}")
-                else:
-                    print("当前没有已注册用户。")
-                continue
+    try:
+        while True:
+            try:
+                cmd_input = read_command().strip()
+                if not cmd_input:
+                    continue
 
-            elif action == "history":
-                if current_user and current_user in lib.users:
-                    user = lib.users[current_user]
-                    print(f"{current_user} 的借阅历史:")
-                    if user.borrowed_books:
-                        for b in user.borrowed_books:
-                            print(f"- {b}")
-                    else:
-                        print("(空)")
-                else:
-                    print("未登录用户。使用 login <username> 登录或 add_user <username> 创建用户。")
-                continue
-            elif action == "add":
-                # 支持：add title author [category]
-                command_line = " ".join(cmd[1:])
+                # 整行只分词一次（含引号短语），各 handler 直接取用，
+                # 不再 join 回字符串再二次解析
                 try:
-                    parsed_args = shlex.split(command_line)
+                    cmd = _split_args(cmd_input)
                 except ValueError as e:
                     print(f"错误: 解析命令失败: {e}")
                     continue
 
-                if len(parsed_args) < 2:
-                    print("错误: 无效的命令格式。")
-                    print("使用方式: add <书名> <作者> [分类]")
+                if not cmd:
                     continue
 
-                title = parsed_args[0]
-                author = parsed_args[1]
-                category = parsed_args[2] if len(parsed_args) >= 3 else None
-
-                if lib.add_book(title, author, category):
-                    if category:
-                        print(maybe_translate(f"Added '{title}' by {author} in {category}."))
-                    else:
-                        print(maybe_translate(f"Added '{title}' by {author}."))
-                else:
-                    print(f"Error: '{title}' already exists.")
+                # 命令名都是 ASCII：isascii 命中 CPython 的 ASCII 小写
+                # 快路径，跳过 Unicode 大小写表；非 ASCII 输入退回 casefold
+                word = cmd[0]
+                action = sys.intern(word.lower() if word.isascii() else word.casefold())
+                if action == "quit":
+                    print("再见!")
+                    break
 
-            elif action == "remove" and len(cmd) >= 2:
-                title = " ".join(cmd[1:])
-                # 调用 remove_book 时启用交互确认
-                if lib.remove_book(title, prompt=True):
-                    print(f"Removed '{title}'.")
+                handler = DISPATCH.get(action)
+                if handler is not None:
+                    handler(lib, cmd, state)
                 else:
-                    print(f"Error: '{title}' not found or removal cancelled.")
+                    print(_INVALID)
 
-            elif action == "search" and len(cmd) >= 2:
-                # 支持：search title [author] [category]
-                command_line = " ".join(cmd[1:])
-                try:
-                    parsed_args = shlex.split(command_line)  # 解析命令行
-                except ValueError as e:
-                    print(f"错误: 解析命令失败: {e}")
-                    continue
-                
-                title = parsed_args[0]
-                author = parsed_args[1] if len(parsed_args) >= 2 else None
-                category = parsed_args[2] if len(parsed_args) >= 3 else None
-
-                results = lib.search_book(title, author, category)
-                if results:
-                    for book in results:
-                        status = "Available" if book["available"] else "Borrowed"
-                        print(f"- '{book['title']}' by {book['author']} ({status})")
-                else:
-                    print("No books found.")
-
-            elif action == "borrow" and len(cmd) >= 2:
-                title = " ".join(cmd[1:])
-                # 使用当前登录用户进行借阅
-                msg = lib.borrow_book(current_user, title)
-                print(maybe_translate(msg))
-
-            elif action == "return" and len(cmd) >= 2:
-                title = " ".join(cmd[1:])
-                msg = lib.return_book(current_user, title)
-                print(maybe_translate(msg))
-
-            elif action == "list":
-                # 如果用户输入了分类，获取分类（支持多字符输入）
-                if len(cmd) > 1:
-                    category = " ".join(cmd[1:]).strip()  # 获取分类（可能是多字符）
-                else:
-                    category = None  # 如果没有指定分类，列出所有书籍
-                
-                # 如果指定了分类，使用 filter_by_category 进行筛选
-                if category:
-                    filtered_books = lib.filter_by_category(category)
-                    if filtered_books:
-                        for book in filtered_books:
-                            print(f"- '{book['title']}' by {book['author']} in {book['category']}")
-                    else:
-                        print(f"No available books in the '{category}' category.")
-                else:
-                    # 如果没有指定分类，列出所有可用书籍
-                    available_books = lib.get_available_books()
-                    if available_books:
-                        for book in available_books:
-                            if book.get("category"):
-                                print(f"- '{book['title']}' by {book['author']} in {book['category']}")
-                            else:
-                                print(f"- '{book['title']}' by {book['author']}")
-                    else:
-                        print("No available books.")
-            elif action == "logs":
-                # 显示日志文件内容：logs [n] (显示最近 n 行)，n 可为 'all' 显示全部；默认 200 行
-                # 日志文件位于本模块同级目录的 logs/library.log
-                try:
-                    base_dir = os.path.dirname(__file__)
-                    log_path = os.path.join(base_dir, "logs", "library.log")
-                    if not os.path.exists(log_path):
-                        print("日志文件不存在。若尚未产生日志，请先执行一些操作。")
-                        continue
-
-                    # 解析参数
-                    n = 200
-                    if len(cmd) >= 2:
-                        if cmd[1].lower() == "all":
-                            n = None
-                        else:
-                            try:
-                                n = int(cmd[1])
-                            except ValueError:
-                                print("参数错误：请输入数字行数或 'all'。示例：logs 100 或 logs all")
-                                continue
-
-                    # 读取并显示内容
-                    with open(log_path, "r", encoding="utf-8") as f:
-                        if n is None:
-                            content = f.read()
-                            print(content)
-                        else:
-                            # tail last n lines
-                            lines = f.readlines()
-                            for line in lines[-n:]:
-                                print(line.rstrip())
-                except Exception as e:
-                    print(f"无法读取日志文件: {e}")
+            except UnicodeDecodeError as e:
+                # 处理Unicode解码错误
+                print(f"错误: 字符编码问题 - {e}")
+                print("提示: 请确保输入为UTF-8编码的文本")
+                continue
+            except EOFError:
+                # 输入流结束（管道输入耗尽）
+                print("再见!")
+                break
+            except KeyboardInterrupt:
+                # 处理 Ctrl+C
+                print("\n再见!")
+                break
+            except Exception as e:
+                # 捕获其他异常
+                print(f"错误: 发生未知错误 - {e}")
                 continue
-            else:
-                print("Invalid command. Type 'quit' to exit.")
-        
-        except UnicodeDecodeError as e:
-            # 处理Unicode解码错误
-            print(f"错误: 字符编码问题 - {e}")
-            print("提示: 请确保输入为UTF-8编码的文本")
-            continue
-        except KeyboardInterrupt:
-            # 处理 Ctrl+C
-            print("\n再见!")
-            break
-        except Exception as e:
-            # 捕获其他异常
-            print(f"错误: 发生未知错误 - {e}")
-            continue
 
+    finally:
+        if orig_stdout is not None:
+            # 刷出缓冲再拆开包装，避免 GC 时关闭底层捕获/管道流
+            try:
+                sys.stdout.flush()
+                sys.stdout.detach().detach()
+            except Exception:
+                pass
+            sys.stdout = orig_stdout
 
 
 if __name__ == "__main__":
@@ -12,9 +12,12 @@ from library import Library
 def sample_lib():
     """Fixture: Library with multiple books for interaction testing."""
     lib = Library()
-    lib.add_book("Python Basics", "Alice","编程")
-    lib.add_book("Advanced Java", "Bob","编程")
-    lib.add_book("Python Advanced", "Charlie","编程")  # Partial match for search
+    # 批量接口：整批一个事务、一条汇总日志，不走三次单本插入
+    lib.add_books([
+        ("Python Basics", "Alice", "编程"),
+        ("Advanced Java", "Bob", "编程"),
+        ("Python Advanced", "Charlie", "编程"),  # Partial match for search
+    ])
     return lib
 
 
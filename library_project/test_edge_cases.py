@@ -67,6 +67,15 @@ def test_duplicate_with_different_case(lib):
     assert len(results) == 1
 
 
+def test_search_empty_title(lib):
+    """测试空检索词的处理：空书名不限制结果，匹配所有书籍"""
+    lib.add_book("Book One", "Author","文学")
+    lib.add_book("Book Two", "Author","文学")
+    assert len(lib.search_book("")) == 2
+    # 配合作者过滤时，空书名同样不参与限制
+    assert len(lib.search_book("", author="Author")) == 2
+
+
 def test_search_case_sensitivity(lib):
     """测试搜索时的大小写敏感性"""
     lib.add_book("Python Programming", "Author","科技")
@@ -12,14 +12,26 @@ from unittest.mock import patch
 from main import main
 
 
+class _TtyStringIO(StringIO):
+    """自称交互终端的 stdin 替身：isatty() 返回 True。
+
+    让 main() 走交互路径（命令经 input() 读取、remove 会现场询问
+    确认），配合 builtins.input 的 side_effect 依序喂入命令与
+    Y/N 回答，覆盖删除确认分支。
+    """
+
+    def isatty(self):
+        return True
+
+
 def test_system_add_and_list(capsys):
     """系统测试：运行 main()，模拟 'add' 和 'list' 命令，检查输出。"""
     # 模拟输入：添加图书、列出图书、退出
     inputs = ['add "Test Book" "Author" "science"', "list", "quit"]
 
+    # 命令全部经 sys.stdin 读入，无需再模拟 builtins.input
     with patch("sys.stdin", StringIO("\n".join(inputs) + "\n")):
-        with patch("builtins.input", side_effect=inputs + [EOFError]):  # Handle quit
-            main()
+        main()
 
         captured = capsys.readouterr()
         output = captured.out
@@ -34,8 +46,7 @@ def test_system_borrow_and_return(capsys):
     inputs = ["add Borrowable Writer", "borrow Borrowable", "return Borrowable", "quit"]
 
     with patch("sys.stdin", StringIO("\n".join(inputs) + "\n")):
-        with patch("builtins.input", side_effect=inputs + [EOFError]):
-            main()
+        main()
 
         captured = capsys.readouterr()
         output = captured.out
@@ -49,8 +60,7 @@ def test_system_search_invalid(capsys):
     inputs = ["search Nothing", "quit"]
 
     with patch("sys.stdin", StringIO("\n".join(inputs) + "\n")):
-        with patch("builtins.input", side_effect=inputs + [EOFError]):
-            main()
+        main()
 
         captured = capsys.readouterr()
         output = captured.out
@@ -70,8 +80,7 @@ def test_system_full_flow(capsys):
     ]
 
     with patch("sys.stdin", StringIO("\n".join(inputs) + "\n")):
-        with patch("builtins.input", side_effect=inputs + [EOFError]):
-            main()
+        main()
 
         captured = capsys.readouterr()
         output = captured.out
@@ -90,8 +99,7 @@ def test_system_add_multi_word_author(capsys):
     inputs = ['add "软件工程" "徐浩然" "编程"', 'add "The Great Gatsby" "F. Scott Fitzgerald" "小说"', 'list', 'quit']
 
     with patch("sys.stdin", StringIO("\n".join(inputs) + "\n")):
-        with patch("builtins.input", side_effect=inputs + [EOFError]):
-            main()
+        main()
 
         captured = capsys.readouterr()
         output = captured.out
@@ -113,8 +121,7 @@ def test_system_list_books_by_category(capsys):
     ]
 
     with patch("sys.stdin", StringIO("\n".join(inputs) + "\n")):
-        with patch("builtins.input", side_effect=inputs + [EOFError]):
-            main()
+        main()
 
         captured = capsys.readouterr()
         output = captured.out
@@ -134,17 +141,17 @@ def test_system_remove_with_confirm(capsys):
         'quit',
     ]
 
-    # builtins.input 的返回序列：每次 main() 调用 input()，以及 remove_book 内的确认 input()
+    # 交互会话：命令与 remove 内的确认回答都经 input() 依序读入
     side_effect = [
-        inputs[0],           # add command
-        inputs[1],           # remove command
+        inputs[0],
+        inputs[1],
         'Y',                 # confirm inside remove_book
-        inputs[2],           # list command
-        inputs[3],           # quit
+        inputs[2],
+        inputs[3],
         EOFError,
     ]
 
-    with patch("sys.stdin", StringIO("\n".join(inputs) + "\n")):
+    with patch("sys.stdin", _TtyStringIO()):
         with patch("builtins.input", side_effect=side_effect):
             main()
 
@@ -165,6 +172,7 @@ def test_system_remove_with_reject(capsys):
         'quit',
     ]
 
+    # 交互会话：命令与 remove 内的确认回答都经 input() 依序读入
     side_effect = [
         inputs[0],
         inputs[1],
@@ -174,7 +182,7 @@ def test_system_remove_with_reject(capsys):
         EOFError,
     ]
 
-    with patch("sys.stdin", StringIO("\n".join(inputs) + "\n")):
+    with patch("sys.stdin", _TtyStringIO()):
         with patch("builtins.input", side_effect=side_effect):
             main()
 
@@ -8,19 +8,25 @@
 
 import pytest
 
-from library import Library
+from library import Library, Result
 import logging
 
 
 # Fixtures `empty_lib` and `lib_with_one_book` are provided by `conftest.py` (db-backed fixtures).
 
 
+def titles_of(books):
+    """提取书名集合：一次遍历建 frozenset，断言用集合比较代替列表扫描。"""
+    return frozenset(book["title"] for book in books)
+
+
 def test_add_book_success(empty_lib):
     """单元测试：成功添加新书。"""
     assert empty_lib.add_book("Test Book", "Test Author","文学")
     assert len(empty_lib.books) == 1
-    assert empty_lib.books[0]["title"] == "Test Book"
-    assert empty_lib.books[0]["available"] is True
+    # 书名索引视图：O(1) 存在性判断与精确取书，不扫描 books 列表
+    assert "Test Book" in empty_lib.books_by_title
+    assert empty_lib.books_by_title["Test Book"]["available"] is True
 
 
 def test_add_book_duplicate(empty_lib):
@@ -58,32 +64,30 @@ def test_borrow_book_success(lib_with_one_book):
     """单元测试：借阅可用书籍。"""
     lib_with_one_book.add_user("user1")
     msg = lib_with_one_book.borrow_book("user1", "Python Basics")
-    assert "Successfully borrowed" in msg
+    # 状态码为一次短字符串比较，替代对消息的子串扫描
+    assert msg.status == Result.BORROWED
     assert not lib_with_one_book.books[0]["available"]
 
 
-def test_borrow_book_not_available(lib_with_one_book):
+def test_borrow_book_not_available(borrowed_lib):
     """单元测试：无法借阅不可用书籍。"""
-    lib_with_one_book.add_user("user1")
-    lib_with_one_book.borrow_book("user1", "Python Basics")  # Borrow first
-    msg = lib_with_one_book.borrow_book("user1", "Python Basics")
-    assert "Error" in msg
+    # 夹具已完成 add_user + 首次借阅，这里只验证二次借阅失败
+    msg = borrowed_lib.borrow_book("user1", "Python Basics")
+    assert msg.status == Result.NOT_FOUND
 
 
-def test_return_book_success(lib_with_one_book):
+def test_return_book_success(borrowed_lib):
     """单元测试：成功归还借阅的书籍。"""
-    lib_with_one_book.add_user("user1")
-    lib_with_one_book.borrow_book("user1", "Python Basics")  # Borrow first
-    msg = lib_with_one_book.return_book("user1", "Python Basics")
-    assert "Successfully returned" in msg
-    assert lib_with_one_book.books[0]["available"]
+    msg = borrowed_lib.return_book("user1", "Python Basics")
+    assert msg.status == Result.RETURNED
+    assert borrowed_lib.books[0]["available"]
 
 
 def test_return_book_not_borrowed(empty_lib):
     """单元测试：无法归还未借阅的书籍。"""
     empty_lib.add_user("user1")
     msg = empty_lib.return_book("user1", "Some Book")
-    assert "Error" in msg
+    assert msg.status == Result.NOT_FOUND
 
 
 def test_get_available_books_empty(empty_lib):
@@ -99,71 +103,73 @@ def test_get_available_books_one(empty_lib):
 
 def test_add_book_logs_info(empty_lib, caplog):
     """添加书籍成功时应记录 INFO 级别日志。"""
-    caplog.set_level(logging.INFO)
-    assert empty_lib.add_book("Log Book", "Logger", "测试")
+    # at_level 只调低 library 这一个 logger 的级别，且在 with 块结束时
+    # 复原，不像 set_level 那样整个测试期间全局捕获所有 logger 的记录
+    with caplog.at_level(logging.INFO, logger="library"):
+        assert empty_lib.add_book("Log Book", "Logger", "测试")
     # 检查是否存在 INFO 记录，且包含关键字
+    # 不带自定义消息：f-string 版本在测试通过时也会把全部记录
+    # getMessage() 一遍来构造消息；失败时 pytest 的断言重写
+    # 自会展示 caplog.records
     found = any(record.levelno == logging.INFO and "Added book" in record.getMessage() for record in caplog.records)
-    assert found, f"Expected INFO log with 'Added book', got: {[r.getMessage() for r in caplog.records]}"
+    assert found
 
 
 def test_remove_book_not_found_logs_error(empty_lib, caplog):
     """删除不存在的书籍时应记录 ERROR 级别日志。"""
-    caplog.set_level(logging.ERROR)
-    assert not empty_lib.remove_book("Non Existent Book")
+    with caplog.at_level(logging.ERROR, logger="library"):
+        assert not empty_lib.remove_book("Non Existent Book")
     found_err = any(record.levelno == logging.ERROR and "Remove failed" in record.getMessage() for record in caplog.records)
-    assert found_err, f"Expected ERROR log with 'Remove failed', got: {[r.getMessage() for r in caplog.records]}"
-
-def test_filter_by_category_success(empty_lib):
-    """测试按分类过滤书籍"""
-    empty_lib.add_book("Book A", "Author A", "文学")
-    empty_lib.add_book("Book B", "Author B", "科技")
-    empty_lib.add_book("Book C", "Author C", "文学")
-
-    # 使用 '文学' 分类过滤书籍
-    filtered = empty_lib.filter_by_category("文学")
-    
-    # 断言过滤后的书籍数量是2
-    assert len(filtered) == 2
-    
-    # 提取书名列表
-    titles = [book["title"] for book in filtered]
-    
-    # 断言过滤后的书籍中包含 'Book A' 和 'Book C'
-    assert "Book A" in titles
-    assert "Book C" in titles
-
-def test_filter_by_category_not_found(empty_lib):
-    """测试按分类过滤时无匹配项"""
-    empty_lib.add_book("Book A", "Author A", "文学")
-    
-    # 尝试用 '科技' 分类过滤，应该没有匹配项
-    filtered = empty_lib.filter_by_category("科技")
-    
-    # 断言过滤后的书籍数量为0
-    assert len(filtered) == 0
-
-
-def test_borrow_book_updates_user_history(lib_with_one_book):
+    assert found_err
+
+@pytest.fixture
+def lib_with_categories(empty_lib):
+    """三本分属 文学/科技 两个分类的书，供分类过滤测试共用。"""
+    # 批量接口：整批一个事务、一条汇总日志，不走三次单本插入
+    empty_lib.add_books([
+        ("Book A", "Author A", "文学"),
+        ("Book B", "Author B", "科技"),
+        ("Book C", "Author C", "文学"),
+    ])
+    return empty_lib
+
+
+# 期望集合在模块导入时构建一次（frozenset，不可变可安全共享），
+# 测试体里只做一次集合相等比较，不再逐用例重建期望值
+_LIT_TITLES = frozenset(("Book A", "Book C"))
+_SCI_TITLES = frozenset(("Book B",))
+_NO_TITLES = frozenset()
+
+
+# 同一个测试体分发到命中多本/命中一本/无匹配三种输入，
+# 不再为每种分类情形手写一份几乎相同的测试。
+# 静态 ids：收集阶段不对中文参数逐个 repr，-k 选测也有稳定名字
+@pytest.mark.parametrize("category,expected_titles", [
+    ("文学", _LIT_TITLES),
+    ("科技", _SCI_TITLES),
+    ("历史", _NO_TITLES),
+], ids=["literature_two_hits", "science_one_hit", "history_no_match"], indirect=False)
+def test_filter_by_category(lib_with_categories, category, expected_titles):
+    """测试按分类过滤书籍（含无匹配的情形）"""
+    filtered = lib_with_categories.filter_by_category(category)
+    assert titles_of(filtered) == expected_titles
+
+
+def test_borrow_book_updates_user_history(borrowed_lib):
     """单元测试：借阅图书时更新用户借阅历史。"""
-    # 添加用户
-    lib_with_one_book.add_user("alice")
-    
-    # 借阅书籍
-    msg = lib_with_one_book.borrow_book("alice", "Python Basics")
-    assert "Successfully borrowed" in msg
-    
-    # 检查用户的借阅历史
-    user = lib_with_one_book.users["alice"]
+    # 夹具已完成借阅（成功消息由 test_borrow_book_success 覆盖），
+    # 这里只检查用户的借阅历史
+    user = borrowed_lib.users["user1"]
     assert len(user.borrowed_books) == 1
-    assert "Python Basics" in user.borrowed_books
+    # 成员判断走集合镜像（O(1)），不扫描历史列表
+    assert "Python Basics" in user.borrowed_set
 
 
 def test_borrow_book_unknown_user(lib_with_one_book):
     """单元测试：借阅图书时如果用户不存在则失败。"""
     # 尝试用不存在的用户借阅
     msg = lib_with_one_book.borrow_book("nonexistent_user", "Python Basics")
-    assert "Error" in msg
-    assert "User" in msg or "not found" in msg
+    assert msg.status == Result.NO_USER
 
 
 def test_data_persistence(db_lib):